@@ -7,10 +7,14 @@ substantive (boundary reassignment, official rename, etc.).
 
 import json
 import logging
+import re
+import sys
 import unicodedata
 from functools import lru_cache
 from pathlib import Path
 
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 RULES_PATH = Path("data/city_change_rules.json")
@@ -19,76 +23,145 @@ RULES_PATH = Path("data/city_change_rules.json")
 # decoded through a wrong single-byte encoding (e.g. latin-1 -> UTF-8 round-trip).
 _MOJIBAKE_CHARS = set("ãÃâÂêÊîÎôÔûÛëËïÏüÜçÇ")
 
+# Matches a C1 control character, or a mojibake marker with the following
+# character captured by a lookahead (so adjacent markers are all checked).
+_MOJIBAKE_RE = re.compile(
+    "[\u0080-\u009f]|[" + "".join(sorted(_MOJIBAKE_CHARS)) + "](?=(.))",
+    re.DOTALL,
+)
+
+# str.translate table deleting the combining marks (category Mn) that NFD
+# decomposition splits off accented Latin letters.
+_COMBINING_RANGES = (
+    (0x0300, 0x0370),  # Combining Diacritical Marks
+    (0x1AB0, 0x1B00),  # Combining Diacritical Marks Extended
+    (0x1DC0, 0x1E00),  # Combining Diacritical Marks Supplement
+    (0x20D0, 0x2100),  # Combining Diacritical Marks for Symbols
+    (0xFE20, 0xFE30),  # Combining Half Marks
+)
+_COMBINING_TABLE = {
+    cp: None
+    for start, end in _COMBINING_RANGES
+    for cp in range(start, end)
+    if unicodedata.category(chr(cp)) == "Mn"
+}
+
+# Separator normalization for _normalize(): hyphens become spaces, periods
+# and apostrophes are dropped.
+_NORM_TABLE = str.maketrans({"-": " ", ".": None, "'": None})
+
+# Whitespace runs, and a check for any whitespace other than single
+# interior spaces (i.e. whether collapsing would change the string at all).
+_WS_RE = re.compile(r"\s+")
+_NEEDS_WS_COLLAPSE_RE = re.compile(r"^\s|\s$|\s\s|[^\S ]")
+
+
+# Rules and the lookups derived from them, built once on first use.
+_RULES: dict | None = None
+_BOUNDARY_PAIRS: set[tuple[str, str]] | None = None
+_RENAMES: dict[tuple[str, str], str] | None = None
+_ABBREVIATIONS: tuple[tuple[str, str, int, int], ...] | None = None
+
 
-@lru_cache(maxsize=1)
 def _load_rules() -> dict:
     """Load and cache the rules file."""
-    if not RULES_PATH.exists():
-        logger.warning("Rules file not found at %s, using empty rules", RULES_PATH)
-        return {}
-    with open(RULES_PATH, encoding="utf-8") as f:
-        return json.load(f)
-
-
-@lru_cache(maxsize=1)
-def _boundary_lookup() -> set[frozenset[str]]:
-    """Build a set of frozensets for O(1) boundary pair lookup.
+    global _RULES
+    if _RULES is None:
+        if not RULES_PATH.exists():
+            logger.warning("Rules file not found at %s, using empty rules", RULES_PATH)
+            _RULES = {}
+        else:
+            _RULES = json.loads(RULES_PATH.read_bytes())
+    return _RULES
+
+
+def _init_lookups() -> tuple[
+    set[tuple[str, str]],
+    dict[tuple[str, str], str],
+    tuple[tuple[str, str, int, int], ...],
+]:
+    """Build the boundary, rename, and abbreviation lookups from the rules.
 
     City names are stored lowercased and accent-stripped for fuzzy matching,
-    since the data may have mojibake or stripped accents.
+    since the data may have mojibake or stripped accents. Boundary pairs are
+    kept in sorted order so lookups are direction-independent.
     """
+    global _BOUNDARY_PAIRS, _RENAMES, _ABBREVIATIONS
     rules = _load_rules()
+
     pairs = set()
     for entry in rules.get("known_boundary_pairs", []):
-        cities = entry["cities"]
-        pair = frozenset(_normalize(c) for c in cities)
-        pairs.add(pair)
-    return pairs
-
+        a, b = (_normalize(c) for c in entry["cities"])
+        pairs.add((a, b) if a <= b else (b, a))
 
-@lru_cache(maxsize=1)
-def _rename_lookup() -> dict[tuple[str, str], str]:
-    """Build old->new rename lookup (normalized). Returns {(old,new): note}."""
-    rules = _load_rules()
-    result = {}
+    renames = {}
     for entry in rules.get("known_renames", []):
         key = (_normalize(entry["old"]), _normalize(entry["new"]))
-        result[key] = entry.get("note", "")
-    return result
+        renames[key] = entry.get("note", "")
+
+    abbreviations = tuple(
+        (short, long, len(short), len(long))
+        for short, long in (
+            (entry["short"].lower(), entry["long"].lower())
+            for entry in rules.get("abbreviation_patterns", [])
+        )
+    )
 
+    _BOUNDARY_PAIRS, _RENAMES, _ABBREVIATIONS = pairs, renames, abbreviations
+    return pairs, renames, abbreviations
 
-@lru_cache(maxsize=1)
-def _abbreviation_pairs() -> list[tuple[str, str]]:
-    """Load abbreviation expansion pairs."""
-    rules = _load_rules()
-    return [
-        (entry["short"].lower(), entry["long"].lower())
-        for entry in rules.get("abbreviation_patterns", [])
-    ]
+
+def _boundary_lookup() -> set[tuple[str, str]]:
+    """Set of sorted normalized city pairs for O(1) boundary pair lookup."""
+    if _BOUNDARY_PAIRS is None:
+        return _init_lookups()[0]
+    return _BOUNDARY_PAIRS
+
+
+def _rename_lookup() -> dict[tuple[str, str], str]:
+    """Old->new rename lookup (normalized). Returns {(old,new): note}."""
+    if _RENAMES is None:
+        return _init_lookups()[1]
+    return _RENAMES
 
 
+def _abbreviation_pairs() -> tuple[tuple[str, str, int, int], ...]:
+    """Abbreviation expansion pairs as (short, long, len_short, len_long)."""
+    if _ABBREVIATIONS is None:
+        return _init_lookups()[2]
+    return _ABBREVIATIONS
+
+
+@lru_cache(maxsize=65536)
 def _normalize(name: str) -> str:
     """Lowercase, strip accents, and collapse whitespace/hyphens."""
-    name = name.lower().strip()
-    # Strip unicode accents
-    name = "".join(
-        c for c in unicodedata.normalize("NFD", name)
-        if unicodedata.category(c) != "Mn"
-    )
-    # Remove mojibake characters too
-    name = name.replace("ã", "").replace("â", "")
+    # Built on the cached fold so the NFD pass is shared with rule 2
+    # (stripping marks and lowercasing commute for every code point)
+    name = _fold(name.strip())
+    if not name.isascii():
+        # Remove mojibake characters too
+        name = name.replace("ã", "").replace("â", "")
     # Normalize separators
-    name = name.replace("-", " ").replace(".", "").replace("'", "")
-    # Collapse whitespace
-    return " ".join(name.split())
+    name = name.translate(_NORM_TABLE)
+    # Collapse whitespace; interned so lookup-key comparisons can short-circuit
+    # on identity (the same few thousand cities recur across millions of rows)
+    if _NEEDS_WS_COLLAPSE_RE.search(name):
+        name = _WS_RE.sub(" ", name).strip()
+    return sys.intern(name)
 
 
+@lru_cache(maxsize=65536)
 def _strip_accents(name: str) -> str:
     """Strip accents but keep case and structure."""
-    return "".join(
-        c for c in unicodedata.normalize("NFD", name)
-        if unicodedata.category(c) != "Mn"
-    )
+    if name.isascii():
+        return name
+    return unicodedata.normalize("NFD", name).translate(_COMBINING_TABLE)
+
+
+@lru_cache(maxsize=65536)
+def _fold(name: str) -> str:
+    """Accent-stripped, lowercased form used for accent-insensitive matching."""
+    return _strip_accents(name).lower()
 
 
 def _has_mojibake(text: str) -> bool:
@@ -99,21 +172,22 @@ def _has_mojibake(text: str) -> bool:
     - ã/Ã adjacent to control characters (common UTF-8 misinterpretation)
     - ã/Ã followed by an uppercase letter mid-word (e.g. MontrãAl)
     """
-    for i, ch in enumerate(text):
-        # C0/C1 control characters are a dead giveaway of encoding issues
-        if 0x0080 <= ord(ch) <= 0x009F:
+    for match in _MOJIBAKE_RE.finditer(text):
+        next_ch = match.group(1)
+        # C0/C1 control characters are a dead giveaway of encoding issues;
+        # otherwise a marker must be followed by an uppercase letter mid-word
+        if next_ch is None or next_ch.isupper():
             return True
-        # ã/Ã followed by uppercase letter mid-word
-        if ch in _MOJIBAKE_CHARS and i + 1 < len(text):
-            next_ch = text[i + 1]
-            if next_ch.isupper():
-                return True
     return False
 
 
+@lru_cache(maxsize=131072)
 def classify_city_change(old_value: str | None, new_value: str | None) -> str:
     """Classify a single city_changed event into a subtype.
 
+    Results are memoized per (old, new) pair, since the same city pair
+    recurs across many postal codes and snapshots.
+
     Args:
         old_value: Previous city name.
         new_value: New city name.
@@ -131,34 +205,39 @@ def classify_city_change(old_value: str | None, new_value: str | None) -> str:
     if old == new:
         return "encoding"  # shouldn't happen, but just in case
 
-    # 1. Encoding/mojibake: either side has mojibake characters
-    if _has_mojibake(old) or _has_mojibake(new):
-        return "encoding"
+    old_low = old.lower()
+    new_low = new.lower()
 
-    # 2. Accent normalization: same string after stripping accents
-    if _strip_accents(old).lower() == _strip_accents(new).lower() and old.lower() != new.lower():
-        return "accent_normalization"
+    # Rules 1-2 need a non-ASCII character to match, so the common all-ASCII
+    # pair skips the regex scan and NFD passes and goes to the cheap rules.
+    if not (old.isascii() and new.isascii()):
+        # 1. Encoding/mojibake: either side has mojibake characters
+        if _has_mojibake(old) or _has_mojibake(new):
+            return "encoding"
+
+        # 2. Accent normalization: same string after stripping accents
+        if _fold(old) == _fold(new) and old_low != new_low:
+            return "accent_normalization"
 
     # 3. Punctuation: trailing period removal or addition
     if old.rstrip(".") == new.rstrip("."):
         return "punctuation"
 
     # 4. Spacing: hyphen vs space, same letters otherwise
-    old_collapsed = old.lower().replace("-", " ").replace("  ", " ").strip()
-    new_collapsed = new.lower().replace("-", " ").replace("  ", " ").strip()
+    old_collapsed = old_low.replace("-", " ").replace("  ", " ").strip()
+    new_collapsed = new_low.replace("-", " ").replace("  ", " ").strip()
     if old_collapsed == new_collapsed:
         return "spacing"
 
     # 5. Abbreviation: St/Saint, Ste/Sainte, Mt/Mount
-    for short, long in _abbreviation_pairs():
-        old_low = old.lower()
-        new_low = new.lower()
+    for short, long, n_short, n_long in _abbreviation_pairs():
         # Check if one uses the short form and the other uses the long form
+        # and the remainders after the prefix match
         if (old_low.startswith(short) and new_low.startswith(long)
-                and old_low.replace(short, long, 1) == new_low):
+                and old_low[n_short:] == new_low[n_long:]):
             return "abbreviation"
         if (old_low.startswith(long) and new_low.startswith(short)
-                and old_low.replace(long, short, 1) == new_low):
+                and old_low[n_long:] == new_low[n_short:]):
             return "abbreviation"
 
     # 6. Known renames
@@ -168,7 +247,7 @@ def classify_city_change(old_value: str | None, new_value: str | None) -> str:
         return "rename"
 
     # 7. Known boundary pairs
-    pair = frozenset([old_norm, new_norm])
+    pair = (old_norm, new_norm) if old_norm <= new_norm else (new_norm, old_norm)
     if pair in _boundary_lookup():
         return "boundary"
 
@@ -182,3 +261,55 @@ def classify_batch(rows: list[tuple[str | None, str | None]]) -> list[str]:
     Returns a list of subtype strings in the same order.
     """
     return [classify_city_change(old, new) for old, new in rows]
+
+
+def classify_batch_vectorized(old: pd.Series, new: pd.Series) -> list[str]:
+    """Classify aligned Series of old/new city names.
+
+    The cheap rules (missing, identical, punctuation, spacing) are applied
+    with vectorized string operations to rows where both names are ASCII.
+    Such rows cannot contain mojibake or accents, so those earlier rules can
+    never fire for them and evaluation order is preserved. Everything else
+    falls back to classify_city_change().
+
+    Returns a list of subtype strings in the same order.
+    """
+    old = old.reset_index(drop=True)
+    new = new.reset_index(drop=True)
+
+    missing = old.isna() | new.isna() | (old == "") | (new == "")
+    result = pd.Series(None, index=old.index, dtype=object).mask(missing, "substantive")
+
+    o = old.where(~missing, "").astype(str).str.strip()
+    n = new.where(~missing, "").astype(str).str.strip()
+    fast = ~missing & ~o.str.contains(r"[^\x00-\x7f]") & ~n.str.contains(r"[^\x00-\x7f]")
+
+    identical = fast & (o == n)
+    result = result.mask(identical, "encoding")
+    pending = fast & ~identical
+
+    punctuation = pending & (o.str.rstrip(".") == n.str.rstrip("."))
+    result = result.mask(punctuation, "punctuation")
+    pending &= ~punctuation
+
+    def _collapse(s: pd.Series) -> pd.Series:
+        return (
+            s.str.lower()
+            .str.replace("-", " ", regex=False)
+            .str.replace("  ", " ", regex=False)
+            .str.strip()
+        )
+
+    spacing = pending & (_collapse(o) == _collapse(n))
+    result = result.mask(spacing, "spacing")
+
+    # Remaining rows need the full rule engine (abbreviation, rename, ...)
+    rest = result.isna()
+    if rest.any():
+        fallback = pd.Series(
+            [classify_city_change(a, b) for a, b in zip(old[rest], new[rest])],
+            index=result.index[rest],
+            dtype=object,
+        )
+        result = result.mask(rest, fallback)
+    return result.tolist()
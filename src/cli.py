@@ -9,16 +9,13 @@ Data sources used by this software have their own licenses:
 - GeoNames: CC BY 4.0
 """
 
-import json
 import logging
 import sys
-import time
 
 import click
 
-from src import db
-from src.config import NAR_SNAPSHOT_ORDER, NAR_SNAPSHOTS
-from src.progress_tracker import tracker
+from src.config import STATIC_DATA_FILES
+from src.timing import Timer, timed
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,14 +24,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Rows fetched from SQLite and written per batch by `export`
+EXPORT_BATCH_SIZE = 10_000
+
+# Rows per Parquet row group written by `export --format parquet`
+PARQUET_ROW_GROUP_SIZE = 64_000
+
 
 @click.group()
 @click.option("-v", "--verbose", is_flag=True, help="Enable debug logging")
-def cli(verbose: bool) -> None:
+@click.pass_context
+def cli(ctx: click.Context, verbose: bool) -> None:
     """Canadian Postal Code Change Tracking System."""
+    from src.progress_tracker import tracker
+
     if verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    # Progress updates are written to the progress file once, when the command exits
+    ctx.with_resource(tracker)
+
 
 # ── download ─────────────────────────────────────────────────────────────────
 
@@ -49,52 +58,48 @@ def cli(verbose: bool) -> None:
 @click.option("--period", help="Specific NAR period (e.g., 2022, 2024-06)")
 def download(source: str, period: str | None) -> None:
     """Download data files from source websites."""
+    from src import db
+    from src.config import NAR_SNAPSHOTS
     from src.downloader import download_all_nar, download_geocoder, download_geonames, download_nar
+    from src.progress_tracker import tracker
 
     # Update progress tracker
     tracker.update_overall_status("Download", "In Progress")
     
-    start_time = time.time()
+    total_timer = Timer()
     db.init_db()
 
     if source in ("nar", "all"):
         if period:
             click.echo(f"Downloading NAR {period} ...")
-            download_start = time.time()
-            download_nar(period)
-            download_duration = time.time() - download_start
+            with timed() as download_timer:
+                download_nar(period)
             tracker.mark_file_downloaded("NAR", period)
-            click.echo(f"  -> NAR {period} downloaded in {download_duration:.2f}s")
+            click.echo(f"  -> NAR {period} downloaded in {download_timer.elapsed:.2f}s")
         else:
             click.echo("Downloading all NAR snapshots ...")
-            download_start = time.time()
-            download_all_nar()
-            download_duration = time.time() - download_start
+            with timed() as download_timer:
+                download_all_nar()
             # Mark all NAR periods as downloaded
-            from src.config import NAR_SNAPSHOTS
-            for nar_period in NAR_SNAPSHOTS.keys():
-                tracker.mark_file_downloaded("NAR", nar_period)
-            click.echo(f"  -> All NAR snapshots downloaded in {download_duration:.2f}s")
+            tracker.mark_files_downloaded_bulk("NAR", [s.period for s in NAR_SNAPSHOTS])
+            click.echo(f"  -> All NAR snapshots downloaded in {download_timer.elapsed:.2f}s")
 
     if source in ("geocoder", "all"):
         click.echo("Downloading Geocoder.ca ...")
-        download_start = time.time()
-        download_geocoder()
-        download_duration = time.time() - download_start
+        with timed() as download_timer:
+            download_geocoder()
         tracker.mark_file_downloaded("Geocoder", "Latest")
-        click.echo(f"  -> Geocoder.ca downloaded in {download_duration:.2f}s")
+        click.echo(f"  -> Geocoder.ca downloaded in {download_timer.elapsed:.2f}s")
 
     if source in ("geonames", "all"):
         click.echo("Downloading GeoNames ...")
-        download_start = time.time()
-        download_geonames()
-        download_duration = time.time() - download_start
+        with timed() as download_timer:
+            download_geonames()
         tracker.mark_file_downloaded("GeoNames", "CA_full")
-        click.echo(f"  -> GeoNames downloaded in {download_duration:.2f}s")
+        click.echo(f"  -> GeoNames downloaded in {download_timer.elapsed:.2f}s")
 
-    total_duration = time.time() - start_time
     tracker.update_overall_status("Download", "Completed")
-    click.echo(f"Download complete. Total time: {total_duration:.2f}s.")
+    click.echo(f"Download complete. Total time: {total_timer.elapsed:.2f}s.")
 
 
 # ── process ──────────────────────────────────────────────────────────────────
@@ -111,57 +116,56 @@ def download(source: str, period: str | None) -> None:
 @click.option("--force", is_flag=True, help="Reprocess even if already done")
 def process(source: str, period: str | None, force: bool) -> None:
     """Parse downloaded files and load into database."""
+    from src import db
     from src.parser_geocoder import process_geocoder
     from src.parser_geonames import process_geonames
     from src.parser_nar import process_all_nar, process_nar_snapshot
+    from src.progress_tracker import tracker
 
     # Update progress tracker
     tracker.update_overall_status("Process", "In Progress")
     
-    start_time = time.time()
+    total_timer = Timer()
     db.init_db()
 
     if source in ("nar", "all"):
         if period:
             click.echo(f"Processing NAR {period} ...")
-            process_start = time.time()
-            count = process_nar_snapshot(period, force=force)
-            process_duration = time.time() - process_start
+            with timed() as process_timer:
+                count = process_nar_snapshot(period, force=force)
             # Mark the file as processed with details
             processed_file = f"nar_{period}_unique.parquet"
             tracker.mark_file_processed("NAR", period, processed_file=processed_file, size=f"{count} postal codes")
-            click.echo(f"  -> {count} unique postal codes processed in {process_duration:.2f}s")
+            click.echo(f"  -> {count} unique postal codes processed in {process_timer.elapsed:.2f}s")
         else:
             click.echo("Processing all NAR snapshots ...")
-            process_start = time.time()
-            results = process_all_nar(force=force)
-            process_duration = time.time() - process_start
+            with timed() as process_timer:
+                results = process_all_nar(force=force)
             total_count = sum(results.values())
+            tracker.mark_files_processed_bulk(
+                "NAR",
+                [(p, f"nar_{p}_unique.parquet", f"{c} postal codes") for p, c in results.items()],
+            )
             for p, c in results.items():
-                processed_file = f"nar_{p}_unique.parquet"
-                tracker.mark_file_processed("NAR", p, processed_file=processed_file, size=f"{c} postal codes")
                 click.echo(f"  {p}: {c} postal codes processed")
-            click.echo(f"  -> Total: {total_count} postal codes in {process_duration:.2f}s")
+            click.echo(f"  -> Total: {total_count} postal codes in {process_timer.elapsed:.2f}s")
 
     if source in ("geocoder", "all"):
         click.echo("Processing Geocoder.ca ...")
-        process_start = time.time()
-        count = process_geocoder(force=force)
-        process_duration = time.time() - process_start
+        with timed() as process_timer:
+            count = process_geocoder(force=force)
         tracker.mark_file_processed("Geocoder", "Latest", processed_file="geocoder_unique.parquet", size=f"{count} postal codes")
-        click.echo(f"  -> {count} postal codes processed in {process_duration:.2f}s")
+        click.echo(f"  -> {count} postal codes processed in {process_timer.elapsed:.2f}s")
 
     if source in ("geonames", "all"):
         click.echo("Processing GeoNames ...")
-        process_start = time.time()
-        count = process_geonames(force=force)
-        process_duration = time.time() - process_start
+        with timed() as process_timer:
+            count = process_geonames(force=force)
         tracker.mark_file_processed("GeoNames", "CA_full", processed_file="geonames_unique.parquet", size=f"{count} postal codes")
-        click.echo(f"  -> {count} postal codes processed in {process_duration:.2f}s")
+        click.echo(f"  -> {count} postal codes processed in {process_timer.elapsed:.2f}s")
 
-    total_duration = time.time() - start_time
     tracker.update_overall_status("Process", "Completed")
-    click.echo(f"Processing complete. Total time: {total_duration:.2f}s.")
+    click.echo(f"Processing complete. Total time: {total_timer.elapsed:.2f}s.")
 
 
 # ── diff ─────────────────────────────────────────────────────────────────────
@@ -178,69 +182,65 @@ def process(source: str, period: str | None, force: bool) -> None:
 @click.option("--to", "to_date", help="Later snapshot date")
 def diff(source: str, from_date: str | None, to_date: str | None) -> None:
     """Run change detection between consecutive snapshots."""
-    from src.differ import diff_all_pairs, diff_merged, diff_snapshots, store_changes
+    from src import db
+    from src.differ import diff_all_pairs, diff_merged, diff_snapshots
+    from src.progress_tracker import tracker
 
     # Update progress tracker
     tracker.update_overall_status("Diff", "In Progress")
 
-    start_time = time.time()
+    total_timer = Timer()
 
     if source == "merged":
         # Only run merged diff
         click.echo("Building and diffing merged snapshots ...")
-        diff_start = time.time()
-        results = diff_merged()
-        diff_duration = time.time() - diff_start
+        with timed() as diff_timer:
+            results = diff_merged()
         total_changes = sum(results.values())
         for label, count in results.items():
             click.echo(f"  {label}: {count} changes")
-        click.echo(f"  -> Total: {total_changes} merged changes in {diff_duration:.2f}s")
+        click.echo(f"  -> Total: {total_changes} merged changes in {diff_timer.elapsed:.2f}s")
     else:
         # Per-source diffs
         sources = [source] if source != "all" else ["nar", "geocoder"]
         for src_type in sources:
             if from_date and to_date:
                 click.echo(f"Diffing {src_type} {from_date} -> {to_date} ...")
-                diff_start = time.time()
-                changes = diff_snapshots(src_type, from_date, to_date)
-                count = store_changes(changes)
-                diff_duration = time.time() - diff_start
-                click.echo(f"  -> {count} changes detected in {diff_duration:.2f}s")
+                with timed() as diff_timer:
+                    count = diff_snapshots(src_type, from_date, to_date)
+                    db.rebuild_change_counts(src_type)
+                click.echo(f"  -> {count} changes detected in {diff_timer.elapsed:.2f}s")
             else:
                 click.echo(f"Diffing all {src_type} snapshot pairs ...")
-                diff_start = time.time()
-                results = diff_all_pairs(src_type)
-                diff_duration = time.time() - diff_start
+                with timed() as diff_timer:
+                    results = diff_all_pairs(src_type)
                 total_changes = sum(results.values())
                 for label, count in results.items():
                     click.echo(f"  {label}: {count} changes")
-                click.echo(f"  -> Total: {total_changes} changes in {diff_duration:.2f}s")
+                click.echo(f"  -> Total: {total_changes} changes in {diff_timer.elapsed:.2f}s")
 
         # Also run merged diff when --source all
         if source == "all":
             click.echo("Building and diffing merged snapshots ...")
-            diff_start = time.time()
-            results = diff_merged()
-            diff_duration = time.time() - diff_start
+            with timed() as diff_timer:
+                results = diff_merged()
             total_changes = sum(results.values())
             for label, count in results.items():
                 click.echo(f"  {label}: {count} changes")
-            click.echo(f"  -> Total: {total_changes} merged changes in {diff_duration:.2f}s")
+            click.echo(f"  -> Total: {total_changes} merged changes in {diff_timer.elapsed:.2f}s")
 
     # Rebuild summary
     click.echo("Rebuilding summary table ...")
-    summary_start = time.time()
-    summary_count = db.rebuild_summary()
-    summary_duration = time.time() - summary_start
-    tracker.add_note(f"Summary rebuilt with {summary_count} postal codes (took {summary_duration:.2f}s)")
+    with timed() as summary_timer:
+        summary_count = db.rebuild_summary()
+    tracker.add_note(f"Summary rebuilt with {summary_count} postal codes (took {summary_timer.elapsed:.2f}s)")
 
     # Update diff status
     tracker.update_pipeline_stage_status("Diff", "Complete")
 
-    total_duration = time.time() - start_time
     tracker.update_overall_status("Diff", "Completed")
     click.echo(f"  -> {summary_count} postal codes in summary")
-    click.echo(f"Diff complete. Total time: {total_duration:.2f}s.")
+    click.echo(f"Diff complete. Total time: {total_timer.elapsed:.2f}s.")
 
 
 # ── reprocess ────────────────────────────────────────────────────────────────
@@ -255,10 +255,13 @@ def diff(source: str, from_date: str | None, to_date: str | None) -> None:
 @click.option("--rebuild-db", is_flag=True, help="Drop and recreate all tables")
 def reprocess(source: str, rebuild_db: bool) -> None:
     """Delete processed data and re-run from raw files."""
+    from src import db
+    from src.progress_tracker import tracker
+
     # Update progress tracker
     tracker.update_overall_status("Reprocess", "In Progress")
     
-    start_time = time.time()
+    total_timer = Timer()
     
     if rebuild_db:
         click.echo("Dropping and recreating database ...")
@@ -281,59 +284,49 @@ def reprocess(source: str, rebuild_db: bool) -> None:
     if source in ("nar", "all"):
         click.echo("Reprocessing NAR ...")
         tracker.log_processing_operation("NAR", "reprocess", "Started")
-        process_start = time.time()
-        process_all_nar(force=True)
-        process_duration = time.time() - process_start
-        tracker.log_processing_operation("NAR", "reprocess", "Completed", duration=process_duration)
+        with timed() as process_timer:
+            process_all_nar(force=True)
+        tracker.log_processing_operation("NAR", "reprocess", "Completed", duration=process_timer.elapsed)
 
     if source in ("geocoder", "all"):
         click.echo("Reprocessing Geocoder.ca ...")
         tracker.log_processing_operation("Geocoder.ca", "reprocess", "Started")
-        process_start = time.time()
-        process_geocoder(force=True)
-        process_duration = time.time() - process_start
-        tracker.log_processing_operation("Geocoder.ca", "reprocess", "Completed", duration=process_duration)
+        with timed() as process_timer:
+            process_geocoder(force=True)
+        tracker.log_processing_operation("Geocoder.ca", "reprocess", "Completed", duration=process_timer.elapsed)
 
     if source in ("geonames", "all"):
         click.echo("Reprocessing GeoNames ...")
         tracker.log_processing_operation("GeoNames", "reprocess", "Started")
-        process_start = time.time()
-        process_geonames(force=True)
-        process_duration = time.time() - process_start
-        tracker.log_processing_operation("GeoNames", "reprocess", "Completed", duration=process_duration)
+        with timed() as process_timer:
+            process_geonames(force=True)
+        tracker.log_processing_operation("GeoNames", "reprocess", "Completed", duration=process_timer.elapsed)
 
     # Re-diff
-    from src.differ import diff_all_pairs, diff_merged
+    from src.differ import diff_all_sources, diff_merged
 
     click.echo("Re-running diffs ...")
-    diff_start = time.time()
-    if source in ("nar", "all"):
-        diff_all_pairs("nar")
-    if source in ("geocoder", "all"):
-        diff_all_pairs("geocoder")
-    diff_duration = time.time() - diff_start
-    click.echo(f"  -> Per-source diffs completed in {diff_duration:.2f}s")
+    with timed() as diff_timer:
+        diff_all_sources([s for s in ("nar", "geocoder") if source in (s, "all")])
+    click.echo(f"  -> Per-source diffs completed in {diff_timer.elapsed:.2f}s")
 
     # Merged diff
     click.echo("Building and diffing merged snapshots ...")
-    merged_start = time.time()
-    diff_merged()
-    merged_duration = time.time() - merged_start
-    click.echo(f"  -> Merged diff completed in {merged_duration:.2f}s")
+    with timed() as merged_timer:
+        diff_merged()
+    click.echo(f"  -> Merged diff completed in {merged_timer.elapsed:.2f}s")
 
     # Rebuild summary
     click.echo("Rebuilding summary ...")
-    summary_start = time.time()
-    count = db.rebuild_summary()
-    summary_duration = time.time() - summary_start
-    tracker.add_note(f"Summary rebuilt with {count} postal codes (took {summary_duration:.2f}s)")
+    with timed() as summary_timer:
+        count = db.rebuild_summary()
+    tracker.add_note(f"Summary rebuilt with {count} postal codes (took {summary_timer.elapsed:.2f}s)")
 
     # Update diff status
     tracker.update_pipeline_stage_status("Diff", "Complete")
 
-    total_duration = time.time() - start_time
     tracker.update_overall_status("Reprocess", "Completed")
-    click.echo(f"Reprocess complete. Summary: {count} postal codes. Total time: {total_duration:.2f}s.")
+    click.echo(f"Reprocess complete. Summary: {count} postal codes. Total time: {total_timer.elapsed:.2f}s.")
 
 
 # ── refresh ──────────────────────────────────────────────────────────────────
@@ -347,83 +340,72 @@ def reprocess(source: str, rebuild_db: bool) -> None:
 )
 def refresh(source: str) -> None:
     """Check for new data, download, process, and diff."""
-    from src.differ import diff_all_pairs, diff_merged
+    from src import db
+    from src.config import NAR_SNAPSHOTS
+    from src.differ import diff_all_sources, diff_merged
     from src.downloader import download_all_nar, download_geocoder
     from src.parser_geocoder import process_geocoder
     from src.parser_nar import process_all_nar
+    from src.progress_tracker import tracker
 
     # Update progress tracker
     tracker.update_overall_status("Refresh", "In Progress")
     
-    start_time = time.time()
+    total_timer = Timer()
     db.init_db()
 
     if source in ("nar", "all"):
         click.echo("Checking for NAR updates ...")
-        download_start = time.time()
-        download_all_nar()
-        download_duration = time.time() - download_start
+        with timed() as download_timer:
+            download_all_nar()
         # Mark NAR files as downloaded
-        from src.config import NAR_SNAPSHOTS
-        for nar_period in NAR_SNAPSHOTS.keys():
-            tracker.mark_file_downloaded("NAR", nar_period)
-        click.echo(f"  -> NAR updates checked in {download_duration:.2f}s")
+        tracker.mark_files_downloaded_bulk("NAR", [s.period for s in NAR_SNAPSHOTS])
+        click.echo(f"  -> NAR updates checked in {download_timer.elapsed:.2f}s")
         
         click.echo("Processing new NAR data ...")
-        process_start = time.time()
-        results = process_all_nar(force=False)
-        process_duration = time.time() - process_start
+        with timed() as process_timer:
+            results = process_all_nar(force=False)
         # Mark NAR files as processed
-        for p, c in results.items():
-            processed_file = f"nar_{p}_unique.parquet"
-            tracker.mark_file_processed("NAR", p, processed_file=processed_file, size=f"{c} postal codes")
-        click.echo(f"  -> NAR data processed in {process_duration:.2f}s")
-        
-        click.echo("Running NAR diffs ...")
-        diff_start = time.time()
-        diff_all_pairs("nar")
-        diff_duration = time.time() - diff_start
-        click.echo(f"  -> NAR diffs completed in {diff_duration:.2f}s")
+        tracker.mark_files_processed_bulk(
+            "NAR",
+            [(p, f"nar_{p}_unique.parquet", f"{c} postal codes") for p, c in results.items()],
+        )
+        click.echo(f"  -> NAR data processed in {process_timer.elapsed:.2f}s")
 
     if source in ("geocoder", "all"):
         click.echo("Checking Geocoder.ca ...")
-        download_start = time.time()
-        download_geocoder()
-        download_duration = time.time() - download_start
+        with timed() as download_timer:
+            download_geocoder()
         tracker.mark_file_downloaded("Geocoder", "Latest")
-        click.echo(f"  -> Geocoder.ca checked in {download_duration:.2f}s")
+        click.echo(f"  -> Geocoder.ca checked in {download_timer.elapsed:.2f}s")
         
         click.echo("Processing Geocoder.ca ...")
-        process_start = time.time()
-        count = process_geocoder(force=False)
-        process_duration = time.time() - process_start
+        with timed() as process_timer:
+            count = process_geocoder(force=False)
         tracker.mark_file_processed("Geocoder", "Latest", processed_file="geocoder_unique.parquet", size=f"{count} postal codes")
-        click.echo(f"  -> Geocoder.ca processed in {process_duration:.2f}s")
-        
-        click.echo("Running Geocoder.ca diffs ...")
-        diff_start = time.time()
-        diff_all_pairs("geocoder")
-        diff_duration = time.time() - diff_start
-        click.echo(f"  -> Geocoder.ca diffs completed in {diff_duration:.2f}s")
+        click.echo(f"  -> Geocoder.ca processed in {process_timer.elapsed:.2f}s")
+
+    # Per-source diffs (independent, so nar and geocoder run concurrently)
+    click.echo("Running per-source diffs ...")
+    with timed() as diff_timer:
+        diff_all_sources([s for s in ("nar", "geocoder") if source in (s, "all")])
+    click.echo(f"  -> Per-source diffs completed in {diff_timer.elapsed:.2f}s")
 
     # Merged diff (cross-source)
     click.echo("Building and diffing merged snapshots ...")
-    merged_start = time.time()
-    diff_merged()
-    merged_duration = time.time() - merged_start
-    click.echo(f"  -> Merged diff completed in {merged_duration:.2f}s")
+    with timed() as merged_timer:
+        diff_merged()
+    click.echo(f"  -> Merged diff completed in {merged_timer.elapsed:.2f}s")
 
-    summary_start = time.time()
-    count = db.rebuild_summary()
-    summary_duration = time.time() - summary_start
-    tracker.add_note(f"Summary rebuilt with {count} postal codes (took {summary_duration:.2f}s)")
+    with timed() as summary_timer:
+        count = db.rebuild_summary()
+    tracker.add_note(f"Summary rebuilt with {count} postal codes (took {summary_timer.elapsed:.2f}s)")
 
     # Update pipeline stages
     tracker.update_pipeline_stage_status("Diff", "Complete")
 
-    total_duration = time.time() - start_time
     tracker.update_overall_status("Refresh", "Completed")
-    click.echo(f"Refresh complete. Summary: {count} postal codes. Total time: {total_duration:.2f}s.")
+    click.echo(f"Refresh complete. Summary: {count} postal codes. Total time: {total_timer.elapsed:.2f}s.")
 
 
 # ── serve ────────────────────────────────────────────────────────────────────
@@ -432,13 +414,25 @@ def refresh(source: str) -> None:
 @cli.command()
 @click.option("--host", default="127.0.0.1", help="Host to bind to")
 @click.option("--port", default=8080, type=int, help="Port to listen on")
-def serve(host: str, port: int) -> None:
+@click.option("--dev/--no-dev", default=False, help="Reload on code changes (single worker)")
+@click.option("--workers", type=int, help="Worker processes (default: CPU count; ignored with --dev)")
+def serve(host: str, port: int, dev: bool, workers: int | None) -> None:
     """Start the web visualization server."""
+    import os
+
     import uvicorn
 
+    from src import db
+
     db.init_db()
     click.echo(f"Starting server at http://{host}:{port}")
-    uvicorn.run("src.web.app:app", host=host, port=port, reload=True)
+    # "auto" selects uvloop (and httptools) when present, which the
+    # uvicorn[standard] extra installs on every platform that supports them
+    uvicorn.run(
+        "src.web.app:app", host=host, port=port, reload=dev,
+        workers=1 if dev else (workers or os.cpu_count() or 1),
+        loop="auto", http="auto",
+    )
 
 
 # ── stats ────────────────────────────────────────────────────────────────────
@@ -452,52 +446,67 @@ def serve(host: str, port: int) -> None:
 )
 def stats(source: str) -> None:
     """Print summary statistics."""
+    from src import db
+    from src.progress_tracker import tracker
+
     db.init_db()
     conn = db.get_connection()
 
     sources = [source] if source != "all" else ["nar", "geocoder", "geonames"]
-
-    for src_type in sources:
-        # Snapshot counts
-        row = conn.execute(
-            """
-            SELECT COUNT(DISTINCT snapshot_date) AS n_snapshots,
-                   COUNT(DISTINCT postal_code) AS n_codes
-            FROM postal_code_snapshots WHERE source_type = ?
+    placeholders = ", ".join("?" * len(sources))
+
+    # One grouped query per table covers every requested source
+    code_counts = {
+        r["source_type"]: r["n_codes"]
+        for r in conn.execute(
+            f"""
+            SELECT source_type, COUNT(DISTINCT postal_code) AS n_codes
+            FROM postal_code_snapshots WHERE source_type IN ({placeholders})
+            GROUP BY source_type
             """,
-            (src_type,),
-        ).fetchone()
+            sources,
+        )
+    }
+
+    snapshot_counts: dict[str, list] = {}
+    for r in conn.execute(
+        f"""
+        SELECT source_type, snapshot_date, COUNT(*) AS n
+        FROM postal_code_snapshots
+        WHERE source_type IN ({placeholders})
+        GROUP BY source_type, snapshot_date ORDER BY source_type, snapshot_date
+        """,
+        sources,
+    ):
+        snapshot_counts.setdefault(r["source_type"], []).append(r)
+
+    change_counts: dict[str, list] = {}
+    for r in conn.execute(
+        f"""
+        SELECT source_type, change_type, COUNT(*) AS n
+        FROM postal_code_changes
+        WHERE source_type IN ({placeholders})
+        GROUP BY source_type, change_type ORDER BY source_type, n DESC
+        """,
+        sources,
+    ):
+        change_counts.setdefault(r["source_type"], []).append(r)
 
-        if row["n_snapshots"] == 0:
+    for src_type in sources:
+        rows = snapshot_counts.get(src_type)
+        if not rows:
             continue
 
         click.echo(f"\n=== {src_type.upper()} ===")
-        click.echo(f"  Snapshots: {row['n_snapshots']}")
-        click.echo(f"  Unique postal codes (across all snapshots): {row['n_codes']}")
+        click.echo(f"  Snapshots: {len(rows)}")
+        click.echo(f"  Unique postal codes (across all snapshots): {code_counts[src_type]}")
 
         # Per-snapshot counts
-        rows = conn.execute(
-            """
-            SELECT snapshot_date, COUNT(*) AS n
-            FROM postal_code_snapshots
-            WHERE source_type = ?
-            GROUP BY snapshot_date ORDER BY snapshot_date
-            """,
-            (src_type,),
-        ).fetchall()
         for r in rows:
             click.echo(f"    {r['snapshot_date']}: {r['n']:,} postal codes")
 
         # Change counts
-        rows = conn.execute(
-            """
-            SELECT change_type, COUNT(*) AS n
-            FROM postal_code_changes
-            WHERE source_type = ?
-            GROUP BY change_type ORDER BY n DESC
-            """,
-            (src_type,),
-        ).fetchall()
+        rows = change_counts.get(src_type)
         if rows:
             click.echo("  Changes:")
             for r in rows:
@@ -532,22 +541,25 @@ def stats(source: str) -> None:
 @click.option(
     "--format",
     "fmt",
-    type=click.Choice(["csv", "json"]),
+    type=click.Choice(["csv", "json", "parquet"]),
     default="csv",
-    help="Output format",
+    help="Output format (parquet is zstd-compressed)",
 )
 @click.option("--output", "-o", type=click.Path(), help="Output file path")
 @click.option("--source", default="nar", help="Source type to export")
 def export(fmt: str, output: str | None, source: str) -> None:
-    """Export change data to CSV or JSON."""
-    import pandas as pd
+    """Export change data to CSV, JSON, or Parquet."""
+    import csv
+
+    from src import db
+    from src.progress_tracker import tracker
 
     # Update progress tracker
     tracker.update_overall_status("Export", "In Progress")
     
-    start_time = time.time()
+    total_timer = Timer()
     conn = db.get_connection()
-    df = pd.read_sql(
+    cursor = conn.execute(
         """
         SELECT postal_code, change_type, source_type,
                snapshot_before, snapshot_after,
@@ -556,12 +568,15 @@ def export(fmt: str, output: str | None, source: str) -> None:
         WHERE source_type = ?
         ORDER BY snapshot_after, change_type, postal_code
         """,
-        conn,
-        params=(source,),
+        (source,),
     )
-    conn.close()
+    columns = [d[0] for d in cursor.description]
+    # Parquet batches double as row groups, so they are fetched larger
+    batch_size = PARQUET_ROW_GROUP_SIZE if fmt == "parquet" else EXPORT_BATCH_SIZE
+    batch = cursor.fetchmany(batch_size)
 
-    if df.empty:
+    if not batch:
+        conn.close()
         click.echo("No changes to export.")
         tracker.add_note(f"No changes to export for {source} source")
         tracker.update_overall_status("Export", "Completed - No Data")
@@ -570,17 +585,52 @@ def export(fmt: str, output: str | None, source: str) -> None:
     if output is None:
         output = f"postal_code_changes_{source}.{fmt}"
 
-    export_start = time.time()
-    if fmt == "csv":
-        df.to_csv(output, index=False)
+    # Stream batches from the cursor straight to the file (constant memory);
+    # each batch is encoded by one writerows/join call instead of per row
+    export_timer = Timer()
+    count = 0
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # All exported columns are TEXT
+        schema = pa.schema([(name, pa.string()) for name in columns])
+        with pq.ParquetWriter(
+            output, schema, compression="zstd", compression_level=3
+        ) as writer:
+            while batch:
+                # Transpose rows into column arrays; no per-row dicts
+                arrays = [pa.array(col, pa.string()) for col in zip(*batch)]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                count += len(batch)
+                batch = cursor.fetchmany(batch_size)
     else:
-        df.to_json(output, orient="records", indent=2)
-    export_duration = time.time() - export_start
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            if fmt == "csv":
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(columns)
+                while batch:
+                    writer.writerows(batch)
+                    count += len(batch)
+                    batch = cursor.fetchmany(batch_size)
+            else:
+                from src.json_encode import dumps
+
+                f.write("[")
+                while batch:
+                    f.write(",\n" if count else "\n")
+                    f.write(",\n".join(
+                        dumps(dict(zip(columns, row)), indent=True).decode() for row in batch
+                    ))
+                    count += len(batch)
+                    batch = cursor.fetchmany(batch_size)
+                f.write("\n]\n")
+    conn.close()
+    export_timer.stop()
 
-    total_duration = time.time() - start_time
-    tracker.add_note(f"Exported {len(df)} changes to {output} (took {export_duration:.2f}s)")
+    tracker.add_note(f"Exported {count} changes to {output} (took {export_timer.elapsed:.2f}s)")
     tracker.update_overall_status("Export", "Completed")
-    click.echo(f"Exported {len(df)} changes to {output}. Total time: {total_duration:.2f}s.")
+    click.echo(f"Exported {count} changes to {output}. Total time: {total_timer.elapsed:.2f}s.")
 
 
 # ── classify ──────────────────────────────────────────────────────────────────
@@ -589,9 +639,10 @@ def export(fmt: str, output: str | None, source: str) -> None:
 @cli.command()
 def classify() -> None:
     """Backfill change_subtype for all city_changed records."""
+    from src import db
     from src.classifier import classify_city_change
 
-    start_time = time.time()
+    total_timer = Timer()
     db.init_db()
     db.ensure_change_subtype_column()
 
@@ -629,8 +680,7 @@ def classify() -> None:
 
     conn.close()
 
-    duration = time.time() - start_time
-    click.echo(f"\nClassification complete in {duration:.2f}s:")
+    click.echo(f"\nClassification complete in {total_timer.elapsed:.2f}s:")
     for subtype, count in sorted(counts.items(), key=lambda x: -x[1]):
         click.echo(f"  {subtype:25s} {count:>8,}")
 
@@ -639,15 +689,20 @@ def classify() -> None:
 
 
 @cli.command("generate-static")
-def generate_static() -> None:
+@click.option(
+    "--only",
+    multiple=True,
+    type=click.Choice(STATIC_DATA_FILES),
+    help="Regenerate only these files (repeatable; default: all).",
+)
+def generate_static(only: tuple[str, ...]) -> None:
     """Generate static site JSON data files from the database."""
     from src.static_generator import generate_all
 
-    start_time = time.time()
+    total_timer = Timer()
     click.echo("Generating static site data ...")
-    generate_all()
-    duration = time.time() - start_time
-    click.echo(f"Static site data generated in {duration:.2f}s. Open docs/index.html in a browser.")
+    generate_all(only or None)
+    click.echo(f"Static site data generated in {total_timer.elapsed:.2f}s. Open docs/index.html in a browser.")
 
 
 if __name__ == "__main__":
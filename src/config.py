@@ -1,6 +1,9 @@
 """Paths, URLs, province mappings, and other constants."""
 
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
 
 # ── Paths ────────────────────────────────────────────────────────────────────
 
@@ -20,35 +23,57 @@ NAR_CATALOGUE_URL = (
     "https://www150.statcan.gc.ca/n1/pub/46-26-0002/462600022022001-eng.htm"
 )
 
-NAR_SNAPSHOTS: dict[str, dict] = {
-    "2022": {
-        "url": "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/2022.zip",
-        "reference_date": "2022-01-01",
-    },
-    "2023": {
-        "url": "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/2023.zip",
-        "reference_date": "2023-01-01",
-    },
-    "2024-06": {
-        "url": "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/2024.zip",
-        "reference_date": "2024-06-01",
-    },
-    "2024-12": {
-        "url": "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/202412.zip",
-        "reference_date": "2024-12-01",
-    },
-    "2025-07": {
-        "url": "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/202507.zip",
-        "reference_date": "2025-07-01",
-    },
-    "2025-12": {
-        "url": "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/202512.zip",
-        "reference_date": "2025-12-01",
-    },
-}
-
-# Ordered list of snapshot periods for diffing consecutive pairs
-NAR_SNAPSHOT_ORDER = ["2022", "2023", "2024-06", "2024-12", "2025-07", "2025-12"]
+
+class NarSnapshot(NamedTuple):
+    """One NAR release: period label, ZIP URL, reference date, optional digest.
+
+    When ``sha256`` is set, downloads are verified against it.
+    """
+
+    period: str
+    url: str
+    reference_date: str
+    sha256: str | None = None
+
+
+# Snapshots in chronological order; consecutive pairs are diffed
+NAR_SNAPSHOTS: tuple[NarSnapshot, ...] = (
+    NarSnapshot(
+        "2022",
+        "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/2022.zip",
+        "2022-01-01",
+    ),
+    NarSnapshot(
+        "2023",
+        "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/2023.zip",
+        "2023-01-01",
+    ),
+    NarSnapshot(
+        "2024-06",
+        "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/2024.zip",
+        "2024-06-01",
+    ),
+    NarSnapshot(
+        "2024-12",
+        "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/202412.zip",
+        "2024-12-01",
+    ),
+    NarSnapshot(
+        "2025-07",
+        "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/202507.zip",
+        "2025-07-01",
+    ),
+    NarSnapshot(
+        "2025-12",
+        "https://www150.statcan.gc.ca/n1/pub/46-26-0002/2022001/202512.zip",
+        "2025-12-01",
+    ),
+)
+
+NAR_BY_PERIOD: dict[str, NarSnapshot] = {s.period: s for s in NAR_SNAPSHOTS}
+
+# Maximum number of NAR snapshot ZIPs downloaded concurrently
+NAR_DOWNLOAD_WORKERS = 4
 
 # ── Geocoder.ca ──────────────────────────────────────────────────────────────
 
@@ -60,8 +85,10 @@ GEONAMES_URL = "https://download.geonames.org/export/zip/CA_full.csv.zip"
 
 # ── Province mappings ────────────────────────────────────────────────────────
 
+# Mappings are read-only views; nothing should patch them at runtime
+
 # NAR uses numeric province codes
-PROVINCE_CODE_TO_ABBR: dict[str, str] = {
+PROVINCE_CODE_TO_ABBR: Mapping[str, str] = MappingProxyType({
     "10": "NL",
     "11": "PE",
     "12": "NS",
@@ -75,10 +102,10 @@ PROVINCE_CODE_TO_ABBR: dict[str, str] = {
     "60": "YT",
     "61": "NT",
     "62": "NU",
-}
+})
 
 # First letter of postal code → province (for validation / fallback)
-FSA_FIRST_LETTER_TO_PROVINCE: dict[str, str] = {
+FSA_FIRST_LETTER_TO_PROVINCE: Mapping[str, str] = MappingProxyType({
     "A": "NL",
     "B": "NS",
     "C": "PE",
@@ -97,12 +124,12 @@ FSA_FIRST_LETTER_TO_PROVINCE: dict[str, str] = {
     "V": "BC",
     "X": "NT",  # default; disambiguate NU below
     "Y": "YT",
-}
+})
 
 # FSAs that belong to Nunavut (rest of X = NWT)
 NUNAVUT_FSAS = frozenset({"X0A", "X0B", "X0C"})
 
-PROVINCE_ABBR_TO_NAME: dict[str, str] = {
+PROVINCE_ABBR_TO_NAME: Mapping[str, str] = MappingProxyType({
     "NL": "Newfoundland and Labrador",
     "PE": "Prince Edward Island",
     "NS": "Nova Scotia",
@@ -116,12 +143,21 @@ PROVINCE_ABBR_TO_NAME: dict[str, str] = {
     "YT": "Yukon",
     "NT": "Northwest Territories",
     "NU": "Nunavut",
-}
+})
 
 # ── NAR processing constants ────────────────────────────────────────────────
 
 # Actual NAR CSV column mapping is in parser_nar.py (MAIL_POSTAL_CODE, etc.)
-NAR_CHUNK_SIZE = 500_000
+# Rows per read_csv chunk. Each row is five short string columns, so 128k rows
+# bounds a worker's chunk plus its groupby to tens of MB; larger chunks mostly
+# add memory pressure (and cache misses) across the process pool.
+NAR_CHUNK_SIZE = 128_000
+
+# ── Static site ──────────────────────────────────────────────────────────────
+
+# docs/data/<name>.json files written by static_generator (one generator each);
+# also the choices of generate-static --only
+STATIC_DATA_FILES = ("summary", "timeline", "by_province", "added", "removed", "city_changed")
 
 # ── Web server defaults ─────────────────────────────────────────────────────
 
@@ -1,6 +1,13 @@
 """SQLite database schema, connection helpers, and common queries."""
 
+import atexit
+import math
+import os
 import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 from src.config import DB_PATH
@@ -29,10 +36,12 @@ CREATE TABLE IF NOT EXISTS postal_code_snapshots (
     longitude       REAL,
     csd_code        TEXT,
     address_count   INTEGER,
-    fsa             TEXT GENERATED ALWAYS AS (SUBSTR(postal_code, 1, 3)) STORED,
+    -- VIRTUAL: computed on read, so rows stay narrow; idx_snapshots_fsa
+    -- indexes the fsa expression itself
+    fsa             TEXT GENERATED ALWAYS AS (SUBSTR(postal_code, 1, 3)) VIRTUAL,
     is_rural        INTEGER GENERATED ALWAYS AS (
         CASE WHEN SUBSTR(postal_code, 2, 1) = '0' THEN 1 ELSE 0 END
-    ) STORED,
+    ) VIRTUAL,
     PRIMARY KEY (postal_code, snapshot_date, source_type)
 );
 
@@ -40,8 +49,27 @@ CREATE INDEX IF NOT EXISTS idx_snapshots_fsa
     ON postal_code_snapshots(fsa);
 CREATE INDEX IF NOT EXISTS idx_snapshots_province
     ON postal_code_snapshots(province_abbr);
-CREATE INDEX IF NOT EXISTS idx_snapshots_date
-    ON postal_code_snapshots(snapshot_date);
+-- Covers the per-snapshot scans in the differ and API, so they never touch
+-- the table rows; the (source_type, snapshot_date) prefix serves date lookups.
+DROP INDEX IF EXISTS idx_snapshots_date;
+DROP INDEX IF EXISTS idx_snapshots_source_date;
+CREATE INDEX IF NOT EXISTS idx_snapshots_source_date_cov
+    ON postal_code_snapshots(
+        source_type, snapshot_date, postal_code,
+        province_abbr, city_name, csd_code, latitude, longitude
+    );
+-- Partial indexes for rebuild_summary: real-source rows in postal_code order
+-- for real_sources, merged rows in the latest-row window's partition order,
+-- each covering the columns its query reads so neither scan needs a sort.
+CREATE INDEX IF NOT EXISTS idx_snapshots_nonmerged_pc
+    ON postal_code_snapshots(postal_code, source_type)
+    WHERE source_type != 'merged';
+CREATE INDEX IF NOT EXISTS idx_snapshots_merged_pc
+    ON postal_code_snapshots(
+        postal_code, snapshot_date DESC, source_type,
+        province_abbr, city_name, latitude, longitude
+    )
+    WHERE source_type = 'merged';
 
 CREATE TABLE IF NOT EXISTS postal_code_changes (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -58,18 +86,48 @@ CREATE TABLE IF NOT EXISTS postal_code_changes (
     created_at      TEXT DEFAULT (datetime('now'))
 );
 
-CREATE INDEX IF NOT EXISTS idx_changes_type
-    ON postal_code_changes(change_type);
-CREATE INDEX IF NOT EXISTS idx_changes_subtype
-    ON postal_code_changes(change_subtype);
-CREATE INDEX IF NOT EXISTS idx_changes_fsa
-    ON postal_code_changes(fsa);
-CREATE INDEX IF NOT EXISTS idx_changes_province
-    ON postal_code_changes(province_abbr);
-CREATE INDEX IF NOT EXISTS idx_changes_dates
-    ON postal_code_changes(snapshot_before, snapshot_after);
-
-CREATE TABLE IF NOT EXISTS postal_code_summary (
+-- postal_code_changes counted per source, type, pair, province and FSA;
+-- rebuilt after each diff (rebuild_change_counts) so the timeline, province
+-- and FSA aggregates read a few thousand rows instead of every change
+CREATE TABLE IF NOT EXISTS change_counts (
+    source_type     TEXT NOT NULL,
+    change_type     TEXT NOT NULL,
+    snapshot_before TEXT NOT NULL,
+    snapshot_after  TEXT NOT NULL,
+    province_abbr   TEXT,
+    fsa             TEXT,
+    change_count    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_change_counts_source
+    ON change_counts(source_type, change_type);
+
+"""
+
+# Secondary indexes on postal_code_changes by name; bulk diff runs drop them
+# and rebuild each in one pass afterwards (see deferred_change_indexes).
+CHANGE_INDEXES = {
+    "idx_changes_type": "postal_code_changes(change_type)",
+    "idx_changes_subtype": "postal_code_changes(change_subtype)",
+    "idx_changes_fsa": "postal_code_changes(fsa)",
+    "idx_changes_province": "postal_code_changes(province_abbr)",
+    "idx_changes_dates": "postal_code_changes(snapshot_before, snapshot_after)",
+    # snapshot_after, postal_code: the static generators' per-type listings
+    # read in index order instead of sorting
+    "idx_changes_source_type_date": (
+        "postal_code_changes(source_type, change_type, snapshot_after, postal_code)"
+    ),
+}
+CHANGE_INDEXES_SQL = "".join(
+    f"CREATE INDEX IF NOT EXISTS {name}\n    ON {columns};\n"
+    for name, columns in CHANGE_INDEXES.items()
+)
+
+# Superseded by idx_changes_source_type_date, which has the same prefix
+SCHEMA_SQL += "DROP INDEX IF EXISTS idx_changes_source_type;\n" + CHANGE_INDEXES_SQL
+
+# Templated so rebuild_summary can build a replacement table and swap it in.
+SUMMARY_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {table} (
     postal_code     TEXT PRIMARY KEY,
     first_seen      TEXT NOT NULL,
     last_seen       TEXT NOT NULL,
@@ -85,21 +143,297 @@ CREATE TABLE IF NOT EXISTS postal_code_summary (
 );
 """
 
+SCHEMA_SQL += SUMMARY_TABLE_SQL.format(table="postal_code_summary")
+
+
+# Prepared-statement cache per connection (sqlite3 defaults to 128). Shared
+# connections live for a whole run, so the diff templates and the API's
+# filter-dependent query variants stay prepared across calls.
+SQLITE_CACHED_STATEMENTS = 512
+
+EARTH_RADIUS_M = 6_371_000.0
+
+
+def _haversine_m(
+    lat1: float | None, lon1: float | None, lat2: float | None, lon2: float | None
+) -> float | None:
+    """Great-circle distance in metres; NULL if any coordinate is NULL."""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    h = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
 
 def get_connection(db_path: Path | None = None) -> sqlite3.Connection:
-    """Return a connection with WAL mode and foreign keys enabled."""
+    """Return a connection with WAL mode, foreign keys, and I/O tuning enabled.
+
+    synchronous=NORMAL is safe under WAL (only the last commits are at risk on
+    power loss), the 128 MB page cache keeps snapshot B-trees hot through
+    rebuild_summary, and the mmap window lets large scans read pages without a
+    syscall each. Automatic checkpoints only run every 10k WAL pages; long
+    write runs call checkpoint() themselves to keep the WAL bounded.
+    """
     path = db_path or DB_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    # Concurrent per-source diffs can wait on each other's write transaction
+    conn = sqlite3.connect(
+        str(path), timeout=60.0, cached_statements=SQLITE_CACHED_STATEMENTS
+    )
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA foreign_keys=ON;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA cache_size=-131072;
+        PRAGMA mmap_size=268435456;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA wal_autocheckpoint=10000;
+    """)
+    # Registered here rather than relying on SQLite's optional math functions,
+    # which not every build compiles in
+    conn.create_function("haversine_m", 4, _haversine_m, deterministic=True)
     conn.row_factory = sqlite3.Row
     return conn
 
 
-def init_db(db_path: Path | None = None) -> None:
-    """Create all tables and indexes if they don't exist."""
+def get_bulk_connection(db_path: Path | None = None) -> sqlite3.Connection:
+    """Return a get_connection() for snapshot loads that skips commit fsyncs.
+
+    synchronous=OFF hands commits to the OS without waiting for the disk. That
+    is only acceptable because every snapshot it writes can be rebuilt: an OS
+    crash or power loss mid-load may lose or damage the load, and rerunning
+    `process --force` (or `diff`, for merged snapshots) redoes it.
+    """
     conn = get_connection(db_path)
+    conn.execute("PRAGMA synchronous=OFF")
+    return conn
+
+
+def get_read_connection(db_path: Path | None = None) -> sqlite3.Connection:
+    """Return a read-only connection (mode=ro, query_only) to an existing DB.
+
+    Under WAL, readers never wait on the writer, and a separate connection
+    keeps large snapshot scans out of the writer's page cache.
+    """
+    path = db_path or DB_PATH
+    conn = sqlite3.connect(
+        path.resolve().as_uri() + "?mode=ro",
+        uri=True,
+        timeout=60.0,
+        cached_statements=SQLITE_CACHED_STATEMENTS,
+    )
+    conn.executescript("""
+        PRAGMA query_only=ON;
+        PRAGMA cache_size=-131072;
+        PRAGMA mmap_size=268435456;
+        PRAGMA temp_store=MEMORY;
+    """)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# Long-lived connections for the helpers below, one per
+# (process, thread, path, role)
+_local = threading.local()
+
+
+def _cached_connection(db_path: Path | None, readonly: bool) -> sqlite3.Connection:
+    path = (db_path or DB_PATH).resolve()
+    cache = getattr(_local, "connections", None)
+    if cache is None:
+        cache = _local.connections = {}
+    key = (os.getpid(), path, readonly)
+    conn = cache.get(key)
+    if conn is None:
+        factory = get_read_connection if readonly else get_connection
+        conn = cache[key] = factory(path)
+    return conn
+
+
+def get_shared_connection(db_path: Path | None = None) -> sqlite3.Connection:
+    """Return this thread's cached writer connection to the database.
+
+    Unlike get_connection(), repeated calls reuse one connection, so the
+    PRAGMA setup runs once and SQLite's page cache stays warm across the many
+    small helper queries of a pipeline run. Callers must not close it. The
+    cache is keyed by process ID so forked workers never reuse a parent's
+    handle; close_all() releases the calling thread's connections.
+    """
+    return _cached_connection(db_path, readonly=False)
+
+
+def get_shared_reader(db_path: Path | None = None) -> sqlite3.Connection:
+    """Return this thread's cached read-only connection (see get_read_connection).
+
+    Same caching rules as get_shared_connection(); use it for bulk reads.
+    """
+    return _cached_connection(db_path, readonly=True)
+
+
+def checkpoint(conn: sqlite3.Connection) -> None:
+    """Copy the WAL back into the database file and truncate it to zero bytes."""
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+
+
+def analyze(conn: sqlite3.Connection) -> None:
+    """Refresh the query planner's statistics after a bulk rewrite.
+
+    analysis_limit samples each index instead of reading it in full, which is
+    enough for the planner's selectivity estimates.
+    """
+    conn.execute("PRAGMA analysis_limit=1000")
+    conn.execute("ANALYZE")
+
+
+@atexit.register
+def close_all() -> None:
+    """Checkpoint and close the calling thread's shared connections."""
+    cache = getattr(_local, "connections", None)
+    while cache:
+        (pid, _path, readonly), conn = cache.popitem()
+        if pid == os.getpid():
+            if not readonly:
+                checkpoint(conn)
+            conn.close()
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run the enclosed statements in one BEGIN IMMEDIATE transaction.
+
+    Taking the write lock up front makes a concurrent writer wait on the busy
+    timeout, instead of failing with SQLITE_BUSY when it tries to upgrade a
+    read transaction mid-way.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    if conn.in_transaction:
+        conn.commit()
+
+
+_deferred_lock = threading.Lock()
+_deferred_users = 0
+
+
+@contextmanager
+def deferred_change_indexes(db_path: Path | None = None) -> Iterator[None]:
+    """Drop the postal_code_changes secondary indexes for a bulk insert run.
+
+    Inserts then only touch the table B-tree, and each index is rebuilt from a
+    single sorted pass on exit. Nested and concurrent users (per-source diff
+    threads) share one drop/rebuild: the first to enter drops, the last to
+    leave recreates.
+    """
+    global _deferred_users
+    with _deferred_lock:
+        _deferred_users += 1
+        if _deferred_users == 1:
+            conn = get_shared_connection(db_path)
+            with write_transaction(conn):
+                for name in CHANGE_INDEXES:
+                    conn.execute(f"DROP INDEX IF EXISTS {name}")
+    try:
+        yield
+    finally:
+        with _deferred_lock:
+            _deferred_users -= 1
+            if _deferred_users == 0:
+                conn = get_shared_connection(db_path)
+                with write_transaction(conn):
+                    for name, columns in CHANGE_INDEXES.items():
+                        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+
+def bulk_insert(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: list[str],
+    rows: Iterable[tuple],
+) -> None:
+    """Insert rows with a single executemany; the caller owns the transaction.
+
+    Rows are bound as-is, so DataFrames can be passed straight through
+    itertuples(index=False, name=None); SQLite stores NaN floats as NULL.
+    """
+    placeholders = ", ".join("?" * len(columns))
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        rows,
+    )
+
+
+# Columns that identify a snapshot row (the postal_code_snapshots primary key)
+_SNAPSHOT_KEY = ("postal_code", "snapshot_date", "source_type")
+
+
+def load_snapshot(
+    conn: sqlite3.Connection,
+    source_type: str,
+    snapshot_date: str,
+    columns: list[str],
+    rows: Iterable[tuple],
+) -> None:
+    """Replace one (source_type, snapshot_date) snapshot; the caller owns the transaction.
+
+    A first load is a plain bulk_insert(). A reload stages the rows in a TEMP
+    table, deletes codes that are no longer present and upserts the rest, where
+    the upsert only rewrites rows whose values changed. Reprocessing an
+    unchanged snapshot then writes next to nothing instead of deleting and
+    re-inserting every row and index entry.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM postal_code_snapshots WHERE source_type = ? AND snapshot_date = ? LIMIT 1",
+        (source_type, snapshot_date),
+    ).fetchone()
+    if not exists:
+        bulk_insert(conn, "postal_code_snapshots", columns, rows)
+        return
+
+    cols = ", ".join(columns)
+    values = [column for column in columns if column not in _SNAPSHOT_KEY]
+    conn.execute("DROP TABLE IF EXISTS temp.snapshot_load")
+    conn.execute(f"CREATE TEMP TABLE snapshot_load ({cols}, PRIMARY KEY (postal_code))")
+    bulk_insert(conn, "temp.snapshot_load", columns, rows)
+    conn.execute(
+        """
+        DELETE FROM postal_code_snapshots
+        WHERE source_type = ? AND snapshot_date = ?
+          AND postal_code NOT IN (SELECT postal_code FROM temp.snapshot_load)
+        """,
+        (source_type, snapshot_date),
+    )
+    # WHERE true resolves the parsing ambiguity between a join's ON and the
+    # upsert's ON CONFLICT; IS NOT keeps the change test NULL-safe
+    conn.execute(f"""
+        INSERT INTO postal_code_snapshots ({cols})
+        SELECT {cols} FROM temp.snapshot_load WHERE true
+        ON CONFLICT ({", ".join(_SNAPSHOT_KEY)}) DO UPDATE SET
+            {", ".join(f"{c} = excluded.{c}" for c in values)}
+        WHERE {" OR ".join(f"{c} IS NOT excluded.{c}" for c in values)}
+    """)
+    conn.execute("DROP TABLE temp.snapshot_load")
+
+
+def init_db(db_path: Path | None = None) -> None:
+    """Create all tables and indexes if they don't exist.
+
+    Only the first call per database path in a process does any work; the
+    pipeline calls this from many entry points.
+    """
+    _init_db((db_path or DB_PATH).resolve())
+
+
+@lru_cache(maxsize=None)
+def _init_db(path: Path) -> None:
+    conn = get_connection(path)
     # Check if we need to migrate (table exists but missing change_subtype)
     existing = conn.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name='postal_code_changes'"
@@ -109,20 +443,32 @@ def init_db(db_path: Path | None = None) -> None:
         if "change_subtype" not in columns:
             conn.execute("ALTER TABLE postal_code_changes ADD COLUMN change_subtype TEXT")
             conn.commit()
-    conn.executescript(SCHEMA_SQL)
+    needs_counts = existing and not conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='change_counts'"
+    ).fetchone()
+    # executescript() autocommits each statement; one explicit transaction
+    # makes the whole schema a single commit
+    conn.executescript(f"BEGIN IMMEDIATE;{SCHEMA_SQL}COMMIT;")
+    if needs_counts:
+        # Databases diffed before change_counts existed
+        with write_transaction(conn):
+            _insert_change_counts(conn, None)
     conn.close()
 
 
 def drop_and_recreate(db_path: Path | None = None) -> None:
     """Drop all tables and recreate the schema."""
     conn = get_connection(db_path)
-    conn.executescript("""
+    conn.executescript(f"""
+        BEGIN IMMEDIATE;
         DROP TABLE IF EXISTS postal_code_summary;
+        DROP TABLE IF EXISTS change_counts;
         DROP TABLE IF EXISTS postal_code_changes;
         DROP TABLE IF EXISTS postal_code_snapshots;
         DROP TABLE IF EXISTS data_sources;
+        {SCHEMA_SQL}
+        COMMIT;
     """)
-    conn.executescript(SCHEMA_SQL)
     conn.close()
 
 
@@ -134,17 +480,16 @@ def record_download(
     db_path: Path | None = None,
 ) -> None:
     """Record that a file was downloaded."""
-    conn = get_connection(db_path)
-    conn.execute(
-        """
-        INSERT OR REPLACE INTO data_sources
-            (source_type, reference_date, download_url, downloaded_at, file_path)
-        VALUES (?, ?, ?, datetime('now'), ?)
-        """,
-        (source_type, reference_date, download_url, file_path),
-    )
-    conn.commit()
-    conn.close()
+    conn = get_shared_connection(db_path)
+    with write_transaction(conn):
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO data_sources
+                (source_type, reference_date, download_url, downloaded_at, file_path)
+            VALUES (?, ?, ?, datetime('now'), ?)
+            """,
+            (source_type, reference_date, download_url, file_path),
+        )
 
 
 def mark_processed(
@@ -153,21 +498,28 @@ def mark_processed(
     row_count: int,
     unique_pc_count: int,
     db_path: Path | None = None,
+    conn: sqlite3.Connection | None = None,
 ) -> None:
-    """Mark a data source as processed with counts."""
-    conn = get_connection(db_path)
-    conn.execute(
-        """
+    """Mark a data source as processed with counts.
+
+    Given conn, the update joins the caller's open transaction (so it commits
+    together with the snapshot load it records); otherwise it runs in its own
+    transaction on the shared connection.
+    """
+    sql = """
         UPDATE data_sources
         SET processed_at = datetime('now'),
             row_count = ?,
             unique_pc_count = ?
         WHERE source_type = ? AND reference_date = ?
-        """,
-        (row_count, unique_pc_count, source_type, reference_date),
-    )
-    conn.commit()
-    conn.close()
+    """
+    params = (row_count, unique_pc_count, source_type, reference_date)
+    if conn is not None:
+        conn.execute(sql, params)
+        return
+    conn = get_shared_connection(db_path)
+    with write_transaction(conn):
+        conn.execute(sql, params)
 
 
 def get_unprocessed_sources(
@@ -175,7 +527,7 @@ def get_unprocessed_sources(
     db_path: Path | None = None,
 ) -> list[dict]:
     """Return data sources that have been downloaded but not processed."""
-    conn = get_connection(db_path)
+    conn = get_shared_connection(db_path)
     sql = """
         SELECT source_type, reference_date, file_path
         FROM data_sources
@@ -187,7 +539,6 @@ def get_unprocessed_sources(
         params.append(source_type)
     sql += " ORDER BY reference_date"
     rows = conn.execute(sql, params).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
@@ -196,7 +547,7 @@ def get_snapshot_dates(
     db_path: Path | None = None,
 ) -> list[str]:
     """Return sorted list of snapshot dates for a source type."""
-    conn = get_connection(db_path)
+    conn = get_shared_connection(db_path)
     rows = conn.execute(
         """
         SELECT DISTINCT snapshot_date
@@ -206,7 +557,6 @@ def get_snapshot_dates(
         """,
         (source_type,),
     ).fetchall()
-    conn.close()
     return [r["snapshot_date"] for r in rows]
 
 
@@ -215,16 +565,52 @@ def clear_changes(
     db_path: Path | None = None,
 ) -> None:
     """Delete change records, optionally filtered by source."""
-    conn = get_connection(db_path)
-    if source_type:
-        conn.execute(
-            "DELETE FROM postal_code_changes WHERE source_type = ?",
-            (source_type,),
-        )
-    else:
-        conn.execute("DELETE FROM postal_code_changes")
-    conn.commit()
-    conn.close()
+    conn = get_shared_connection(db_path)
+    with write_transaction(conn):
+        if source_type:
+            conn.execute(
+                "DELETE FROM postal_code_changes WHERE source_type = ?",
+                (source_type,),
+            )
+            conn.execute("DELETE FROM change_counts WHERE source_type = ?", (source_type,))
+        else:
+            conn.execute("DELETE FROM postal_code_changes")
+            conn.execute("DELETE FROM change_counts")
+
+
+def _insert_change_counts(conn: sqlite3.Connection, source_type: str | None) -> None:
+    where = "WHERE source_type = ?" if source_type else ""
+    conn.execute(
+        f"""
+        INSERT INTO change_counts
+            (source_type, change_type, snapshot_before, snapshot_after,
+             province_abbr, fsa, change_count)
+        SELECT source_type, change_type, snapshot_before, snapshot_after,
+               province_abbr, fsa, COUNT(*)
+        FROM postal_code_changes {where}
+        GROUP BY source_type, change_type, snapshot_before, snapshot_after,
+                 province_abbr, fsa
+        """,
+        (source_type,) if source_type else (),
+    )
+
+
+def rebuild_change_counts(
+    source_type: str | None = None,
+    db_path: Path | None = None,
+) -> None:
+    """Recount change_counts from postal_code_changes, optionally for one source.
+
+    Run after every diff; readers of change_counts see the old or the new
+    counts, never a mix, since the swap is one transaction.
+    """
+    conn = get_shared_connection(db_path)
+    with write_transaction(conn):
+        if source_type:
+            conn.execute("DELETE FROM change_counts WHERE source_type = ?", (source_type,))
+        else:
+            conn.execute("DELETE FROM change_counts")
+        _insert_change_counts(conn, source_type)
 
 
 def clear_snapshots(
@@ -232,30 +618,29 @@ def clear_snapshots(
     db_path: Path | None = None,
 ) -> None:
     """Delete snapshot records, optionally filtered by source."""
-    conn = get_connection(db_path)
-    if source_type:
-        conn.execute(
-            "DELETE FROM postal_code_snapshots WHERE source_type = ?",
-            (source_type,),
-        )
-    else:
-        conn.execute("DELETE FROM postal_code_snapshots")
-    conn.commit()
-    conn.close()
+    conn = get_shared_connection(db_path)
+    with write_transaction(conn):
+        if source_type:
+            conn.execute(
+                "DELETE FROM postal_code_snapshots WHERE source_type = ?",
+                (source_type,),
+            )
+        else:
+            conn.execute("DELETE FROM postal_code_snapshots")
 
 
 def clear_merged_data(db_path: Path | None = None) -> None:
     """Delete all merged snapshots and changes (rebuilt from real sources)."""
-    conn = get_connection(db_path)
-    conn.execute("DELETE FROM postal_code_snapshots WHERE source_type = 'merged'")
-    conn.execute("DELETE FROM postal_code_changes WHERE source_type = 'merged'")
-    conn.commit()
-    conn.close()
+    conn = get_shared_connection(db_path)
+    with write_transaction(conn):
+        conn.execute("DELETE FROM postal_code_snapshots WHERE source_type = 'merged'")
+        conn.execute("DELETE FROM postal_code_changes WHERE source_type = 'merged'")
+        conn.execute("DELETE FROM change_counts WHERE source_type = 'merged'")
 
 
 def ensure_change_subtype_column(db_path: Path | None = None) -> None:
     """Add change_subtype column if it doesn't exist (migration)."""
-    conn = get_connection(db_path)
+    conn = get_shared_connection(db_path)
     columns = [
         row[1] for row in conn.execute("PRAGMA table_info(postal_code_changes)")
     ]
@@ -266,7 +651,6 @@ def ensure_change_subtype_column(db_path: Path | None = None) -> None:
             "ON postal_code_changes(change_subtype)"
         )
         conn.commit()
-    conn.close()
 
 
 def rebuild_summary(db_path: Path | None = None) -> int:
@@ -275,7 +659,7 @@ def rebuild_summary(db_path: Path | None = None) -> int:
     Uses merged snapshots/changes if available, otherwise falls back to
     all source types. Returns the number of rows inserted.
     """
-    conn = get_connection(db_path)
+    conn = get_shared_connection(db_path)
 
     # Check if merged data exists
     has_merged = conn.execute(
@@ -293,76 +677,75 @@ def rebuild_summary(db_path: Path | None = None) -> int:
     max_date = row["max_date"] if row else None
 
     if not max_date:
-        conn.close()
         return 0
 
-    conn.execute("DELETE FROM postal_code_summary")
-    conn.execute(
-        f"""
-        WITH latest AS (
-            SELECT
-                postal_code,
-                province_abbr,
-                city_name,
-                latitude,
-                longitude,
-                ROW_NUMBER() OVER (
+    # Build the replacement table beside the live one and swap it in, so the
+    # old rows are dropped wholesale instead of deleted page by page, and
+    # readers keep seeing the previous summary until the swap commits.
+    with write_transaction(conn):
+        conn.execute("DROP TABLE IF EXISTS postal_code_summary_new")
+        conn.execute(SUMMARY_TABLE_SQL.format(table="postal_code_summary_new"))
+        conn.execute(
+            f"""
+            WITH latest AS (
+                SELECT
+                    postal_code,
+                    source_type,
+                    province_abbr,
+                    city_name,
+                    latitude,
+                    longitude,
+                    snapshot_date AS last_seen,
+                    MIN(snapshot_date) OVER w AS first_seen,
+                    ROW_NUMBER() OVER w AS rn
+                FROM postal_code_snapshots
+                WHERE {snapshot_filter}
+                WINDOW w AS (
                     PARTITION BY postal_code
                     ORDER BY snapshot_date DESC
-                ) AS rn
-            FROM postal_code_snapshots
-            WHERE {snapshot_filter}
-        ),
-        agg AS (
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+                )
+            ),
+            real_sources AS (
+                SELECT postal_code, GROUP_CONCAT(DISTINCT source_type) AS sources
+                FROM postal_code_snapshots
+                WHERE source_type != 'merged'
+                GROUP BY postal_code
+            ),
+            per_code_changes AS (
+                SELECT postal_code, COUNT(*) AS change_count
+                FROM postal_code_changes
+                WHERE {change_filter}
+                GROUP BY postal_code
+            )
+            INSERT INTO postal_code_summary_new
+                (postal_code, first_seen, last_seen, is_active,
+                 province_abbr, city_name, latitude, longitude,
+                 fsa, is_rural, total_changes, sources)
             SELECT
-                postal_code,
-                MIN(snapshot_date) AS first_seen,
-                MAX(snapshot_date) AS last_seen,
-                CASE WHEN MAX(snapshot_date) = ? THEN 1 ELSE 0 END AS is_active,
-                GROUP_CONCAT(DISTINCT source_type) AS sources
-            FROM postal_code_snapshots
-            WHERE {snapshot_filter}
-            GROUP BY postal_code
-        ),
-        real_sources AS (
-            SELECT postal_code, GROUP_CONCAT(DISTINCT source_type) AS sources
-            FROM postal_code_snapshots
-            WHERE source_type != 'merged'
-            GROUP BY postal_code
-        ),
-        change_counts AS (
-            SELECT postal_code, COUNT(*) AS change_count
-            FROM postal_code_changes
-            WHERE {change_filter}
-            GROUP BY postal_code
+                l.postal_code,
+                l.first_seen,
+                l.last_seen,
+                CASE WHEN l.last_seen = ? THEN 1 ELSE 0 END,
+                l.province_abbr,
+                l.city_name,
+                l.latitude,
+                l.longitude,
+                SUBSTR(l.postal_code, 1, 3),
+                CASE WHEN SUBSTR(l.postal_code, 2, 1) = '0' THEN 1 ELSE 0 END,
+                COALESCE(c.change_count, 0),
+                COALESCE(rs.sources, l.source_type)
+            FROM latest l
+            LEFT JOIN per_code_changes c ON c.postal_code = l.postal_code
+            LEFT JOIN real_sources rs ON rs.postal_code = l.postal_code
+            WHERE l.rn = 1
+            """,
+            (max_date,),
         )
-        INSERT INTO postal_code_summary
-            (postal_code, first_seen, last_seen, is_active,
-             province_abbr, city_name, latitude, longitude,
-             fsa, is_rural, total_changes, sources)
-        SELECT
-            a.postal_code,
-            a.first_seen,
-            a.last_seen,
-            a.is_active,
-            l.province_abbr,
-            l.city_name,
-            l.latitude,
-            l.longitude,
-            SUBSTR(a.postal_code, 1, 3),
-            CASE WHEN SUBSTR(a.postal_code, 2, 1) = '0' THEN 1 ELSE 0 END,
-            COALESCE(c.change_count, 0),
-            COALESCE(rs.sources, a.sources)
-        FROM agg a
-        JOIN latest l ON l.postal_code = a.postal_code AND l.rn = 1
-        LEFT JOIN change_counts c ON c.postal_code = a.postal_code
-        LEFT JOIN real_sources rs ON rs.postal_code = a.postal_code
-        """,
-        (max_date,),
-    )
-    count = conn.execute("SELECT COUNT(*) AS n FROM postal_code_summary").fetchone()[
-        "n"
-    ]
-    conn.commit()
-    conn.close()
+        count = conn.execute(
+            "SELECT COUNT(*) AS n FROM postal_code_summary_new"
+        ).fetchone()["n"]
+        conn.execute("DROP TABLE postal_code_summary")
+        conn.execute("ALTER TABLE postal_code_summary_new RENAME TO postal_code_summary")
+    analyze(conn)
     return count
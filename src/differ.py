@@ -1,21 +1,139 @@
 """Compare consecutive postal code snapshots to detect changes."""
 
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 
 from src import db
-from src.classifier import classify_city_change
+from src.classifier import classify_batch_vectorized
 
 logger = logging.getLogger(__name__)
 
+# diff_all_pairs truncates the WAL after this many pairs
+CHECKPOINT_EVERY_PAIRS = 5
+
+
+_CHANGE_COLUMNS = """
+    postal_code, change_type, change_subtype, source_type,
+    snapshot_before, snapshot_after,
+    old_value, new_value, province_abbr, fsa
+"""
+
+# Both snapshot slices joined on postal code; `b` is the earlier one, `a` the later.
+# Both sides are read from the covering index (the planner otherwise probes
+# `a` through the primary key and then fetches each table row).
+_COMMON_CODES = """
+    FROM postal_code_snapshots b INDEXED BY idx_snapshots_source_date_cov
+    JOIN postal_code_snapshots a INDEXED BY idx_snapshots_source_date_cov
+      ON a.source_type = b.source_type
+     AND a.snapshot_date = :after
+     AND a.postal_code = b.postal_code
+    WHERE b.source_type = :source AND b.snapshot_date = :before
+"""
+
+_INSERT_ADDED = f"""
+    INSERT INTO postal_code_changes ({_CHANGE_COLUMNS})
+    SELECT a.postal_code, 'added', NULL, a.source_type, :before, :after,
+           NULL, NULL, a.province_abbr, SUBSTR(a.postal_code, 1, 3)
+    FROM postal_code_snapshots a
+    WHERE a.source_type = :source AND a.snapshot_date = :after
+      AND NOT EXISTS (
+          SELECT 1 FROM postal_code_snapshots b
+          WHERE b.source_type = :source AND b.snapshot_date = :before
+            AND b.postal_code = a.postal_code
+      )
+    ORDER BY a.postal_code
+"""
+
+_INSERT_REMOVED = f"""
+    INSERT INTO postal_code_changes ({_CHANGE_COLUMNS})
+    SELECT b.postal_code, 'removed', NULL, b.source_type, :before, :after,
+           NULL, NULL, b.province_abbr, SUBSTR(b.postal_code, 1, 3)
+    FROM postal_code_snapshots b
+    WHERE b.source_type = :source AND b.snapshot_date = :before
+      AND NOT EXISTS (
+          SELECT 1 FROM postal_code_snapshots a
+          WHERE a.source_type = :source AND a.snapshot_date = :after
+            AND a.postal_code = b.postal_code
+      )
+    ORDER BY b.postal_code
+"""
+
+_INSERT_CSD_CHANGED = f"""
+    INSERT INTO postal_code_changes ({_CHANGE_COLUMNS})
+    SELECT b.postal_code, 'csd_changed', NULL, b.source_type, :before, :after,
+           b.csd_code, a.csd_code, a.province_abbr, SUBSTR(a.postal_code, 1, 3)
+    {_COMMON_CODES}
+      AND COALESCE(b.csd_code, '') <> COALESCE(a.csd_code, '')
+    ORDER BY b.postal_code
+"""
+
+# Location shift > 1 km great-circle. A move that far changes latitude or
+# longitude by more than 1 km / 2R radians, so that cheap per-axis test runs
+# first and haversine_m (registered in db.get_connection) only sees candidates.
+_SHIFT_THRESHOLD_M = 1000.0
+_SHIFT_PREFILTER_DEG = math.degrees(_SHIFT_THRESHOLD_M / (2 * db.EARTH_RADIUS_M))
+_INSERT_LOCATION_SHIFTED = f"""
+    INSERT INTO postal_code_changes ({_CHANGE_COLUMNS})
+    SELECT b.postal_code, 'location_shifted', NULL, b.source_type, :before, :after,
+           b.latitude || ',' || b.longitude, a.latitude || ',' || a.longitude,
+           a.province_abbr, SUBSTR(a.postal_code, 1, 3)
+    {_COMMON_CODES}
+      AND (ABS(b.latitude - a.latitude) > {_SHIFT_PREFILTER_DEG!r}
+           OR ABS(b.longitude - a.longitude) > {_SHIFT_PREFILTER_DEG!r})
+      AND haversine_m(b.latitude, b.longitude, a.latitude, a.longitude) > {_SHIFT_THRESHOLD_M}
+    ORDER BY b.postal_code
+"""
+
+# SQLite's lower() only folds ASCII, so this returns every code whose city
+# differs at all and the case-insensitive comparison happens in Python.
+_SELECT_CITY_CANDIDATES = f"""
+    SELECT b.postal_code, b.city_name AS old_city, a.city_name AS new_city,
+           a.province_abbr, SUBSTR(a.postal_code, 1, 3) AS fsa
+    {_COMMON_CODES}
+      AND COALESCE(b.city_name, '') <> COALESCE(a.city_name, '')
+    ORDER BY b.postal_code
+"""
+
+
+def _has_snapshot(conn, source_type: str, snapshot_date: str) -> bool:
+    row = conn.execute(
+        """
+        SELECT 1 FROM postal_code_snapshots
+        WHERE source_type = ? AND snapshot_date = ?
+        LIMIT 1
+        """,
+        (source_type, snapshot_date),
+    ).fetchone()
+    return row is not None
+
+
+def _city_changes(conn, params: dict[str, str]) -> tuple[list, list[str]]:
+    """Classify case-insensitive city name changes between two snapshots.
+
+    Returns the candidate rows and their subtypes, index-aligned.
+    """
+    rows = [
+        row for row in conn.execute(_SELECT_CITY_CANDIDATES, params)
+        if (row["old_city"] or "").lower() != (row["new_city"] or "").lower()
+    ]
+    if not rows:
+        return [], []
+    subtypes = classify_batch_vectorized(
+        pd.Series([row["old_city"] for row in rows], dtype=object),
+        pd.Series([row["new_city"] for row in rows], dtype=object),
+    )
+    return rows, subtypes
+
 
 def diff_snapshots(
     source_type: str,
     date_before: str,
     date_after: str,
-) -> pd.DataFrame:
-    """Compare two snapshots and return a DataFrame of change events.
+) -> int:
+    """Compare two snapshots and store the change events they imply.
 
     Change types detected:
     - added: postal code in later snapshot but not earlier
@@ -23,191 +141,52 @@ def diff_snapshots(
     - city_changed: same postal code, different city name
     - csd_changed: same postal code, different CSD code
     - location_shifted: centroid moved >1 km
-    """
-    conn = db.get_connection()
 
-    before = pd.read_sql(
-        """
-        SELECT postal_code, city_name, province_abbr, csd_code, latitude, longitude
-        FROM postal_code_snapshots
-        WHERE snapshot_date = ? AND source_type = ?
-        """,
-        conn,
-        params=(date_before, source_type),
-    ).set_index("postal_code")
-
-    after = pd.read_sql(
-        """
-        SELECT postal_code, city_name, province_abbr, csd_code, latitude, longitude
-        FROM postal_code_snapshots
-        WHERE snapshot_date = ? AND source_type = ?
-        """,
-        conn,
-        params=(date_after, source_type),
-    ).set_index("postal_code")
-
-    conn.close()
-
-    empty = pd.DataFrame(columns=[
-        "postal_code", "change_type", "change_subtype", "source_type",
-        "snapshot_before", "snapshot_after",
-        "old_value", "new_value", "province_abbr", "fsa",
-    ])
-
-    if before.empty:
-        logger.warning("No data for %s snapshot %s", source_type, date_before)
-        return empty
-    if after.empty:
-        logger.warning("No data for %s snapshot %s", source_type, date_after)
-        return empty
-
-    changes_dfs = []
-
-    # 1. ADDED: in after but not in before
-    added_codes = after.index.difference(before.index)
-    if len(added_codes) > 0:
-        added_df = pd.DataFrame({
-            "postal_code": added_codes,
-            "change_type": "added",
-            "source_type": source_type,
-            "snapshot_before": date_before,
-            "snapshot_after": date_after,
-            "old_value": None,
-            "new_value": None,
-            "province_abbr": after.loc[added_codes, "province_abbr"].values,
-            "fsa": pd.Series(added_codes).str[:3].values,
-        })
-        changes_dfs.append(added_df)
-
-    # 2. REMOVED: in before but not in after
-    removed_codes = before.index.difference(after.index)
-    if len(removed_codes) > 0:
-        removed_df = pd.DataFrame({
-            "postal_code": removed_codes,
-            "change_type": "removed",
-            "source_type": source_type,
-            "snapshot_before": date_before,
-            "snapshot_after": date_after,
-            "old_value": None,
-            "new_value": None,
-            "province_abbr": before.loc[removed_codes, "province_abbr"].values,
-            "fsa": pd.Series(removed_codes).str[:3].values,
-        })
-        changes_dfs.append(removed_df)
-
-    # 3. MODIFICATIONS for codes present in both snapshots
-    common = before.index.intersection(after.index)
-    if not common.empty:
-        b = before.loc[common]
-        a = after.loc[common]
-
-        # City name changes (case-insensitive comparison)
-        b_city = b["city_name"].fillna("").str.lower()
-        a_city = a["city_name"].fillna("").str.lower()
-        city_mask = b_city != a_city
-        if city_mask.any():
-            pcs = city_mask[city_mask].index
-            old_vals = b.loc[pcs, "city_name"].values
-            new_vals = a.loc[pcs, "city_name"].values
-            subtypes = [
-                classify_city_change(o, n) for o, n in zip(old_vals, new_vals)
-            ]
-            city_df = pd.DataFrame({
-                "postal_code": pcs,
-                "change_type": "city_changed",
-                "change_subtype": subtypes,
-                "source_type": source_type,
-                "snapshot_before": date_before,
-                "snapshot_after": date_after,
-                "old_value": old_vals,
-                "new_value": new_vals,
-                "province_abbr": a.loc[pcs, "province_abbr"].values,
-                "fsa": pd.Series(pcs).str[:3].values,
-            })
-            changes_dfs.append(city_df)
-
-        # CSD code changes
-        b_csd = b["csd_code"].fillna("")
-        a_csd = a["csd_code"].fillna("")
-        csd_mask = b_csd != a_csd
-        if csd_mask.any():
-            pcs = csd_mask[csd_mask].index
-            csd_df = pd.DataFrame({
-                "postal_code": pcs,
-                "change_type": "csd_changed",
-                "source_type": source_type,
-                "snapshot_before": date_before,
-                "snapshot_after": date_after,
-                "old_value": b.loc[pcs, "csd_code"].values,
-                "new_value": a.loc[pcs, "csd_code"].values,
-                "province_abbr": a.loc[pcs, "province_abbr"].values,
-                "fsa": pd.Series(pcs).str[:3].values,
-            })
-            changes_dfs.append(csd_df)
-
-        # Location shift > ~1 km (0.009 deg lat or 0.012 deg lon)
-        lat_diff = (b["latitude"] - a["latitude"]).abs()
-        lon_diff = (b["longitude"] - a["longitude"]).abs()
-        shifted = (lat_diff > 0.009) | (lon_diff > 0.012)
-        if shifted.any():
-            pcs = shifted[shifted].index
-            old_loc = b.loc[pcs, "latitude"].astype(str) + "," + b.loc[pcs, "longitude"].astype(str)
-            new_loc = a.loc[pcs, "latitude"].astype(str) + "," + a.loc[pcs, "longitude"].astype(str)
-            loc_df = pd.DataFrame({
-                "postal_code": pcs,
-                "change_type": "location_shifted",
-                "source_type": source_type,
-                "snapshot_before": date_before,
-                "snapshot_after": date_after,
-                "old_value": old_loc.values,
-                "new_value": new_loc.values,
-                "province_abbr": a.loc[pcs, "province_abbr"].values,
-                "fsa": pd.Series(pcs).str[:3].values,
-            })
-            changes_dfs.append(loc_df)
-
-    if changes_dfs:
-        all_changes = pd.concat(changes_dfs, ignore_index=True)
-    else:
-        all_changes = empty
+    Everything except city changes is computed and inserted by SQLite itself;
+    only codes whose city name differs are fetched for classification.
+    Returns the number of change events inserted.
+    """
+    reader = db.get_shared_reader()
+    for snapshot_date in (date_before, date_after):
+        if not _has_snapshot(reader, source_type, snapshot_date):
+            logger.warning("No data for %s snapshot %s", source_type, snapshot_date)
+            return 0
+
+    params = {"source": source_type, "before": date_before, "after": date_after}
+    city_rows, city_subtypes = _city_changes(reader, params)
+
+    conn = db.get_shared_connection()
+    with db.write_transaction(conn):
+        added = conn.execute(_INSERT_ADDED, params).rowcount
+        removed = conn.execute(_INSERT_REMOVED, params).rowcount
+        # Parameter tuples are generated as executemany consumes them
+        conn.executemany(
+            f"INSERT INTO postal_code_changes ({_CHANGE_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    row["postal_code"], "city_changed", subtype, source_type,
+                    date_before, date_after,
+                    row["old_city"], row["new_city"], row["province_abbr"], row["fsa"],
+                )
+                for row, subtype in zip(city_rows, city_subtypes)
+            ),
+        )
+        modified = len(city_rows)
+        modified += conn.execute(_INSERT_CSD_CHANGED, params).rowcount
+        modified += conn.execute(_INSERT_LOCATION_SHIFTED, params).rowcount
 
     logger.info(
         "Diff %s %s->%s: %d added, %d removed, %d other modifications",
         source_type,
         date_before,
         date_after,
-        len(added_codes),
-        len(removed_codes),
-        len(all_changes) - len(added_codes) - len(removed_codes),
+        added,
+        removed,
+        modified,
     )
 
-    return all_changes
-
-
-def store_changes(changes: pd.DataFrame) -> int:
-    """Insert change events DataFrame into the database. Returns count inserted."""
-    if changes.empty:
-        return 0
-
-    conn = db.get_connection()
-    insert_cols = [
-        "postal_code", "change_type", "change_subtype", "source_type",
-        "snapshot_before", "snapshot_after",
-        "old_value", "new_value", "province_abbr", "fsa",
-    ]
-    # Ensure change_subtype column exists for non-city changes
-    if "change_subtype" not in changes.columns:
-        changes["change_subtype"] = None
-    changes[insert_cols].to_sql(
-        "postal_code_changes",
-        conn,
-        if_exists="append",
-        index=False,
-        chunksize=5000,
-    )
-    conn.commit()
-    conn.close()
-    return len(changes)
+    return added + removed + modified
 
 
 def build_merged_snapshots() -> list[str]:
@@ -223,7 +202,7 @@ def build_merged_snapshots() -> list[str]:
 
     Returns the sorted list of merged snapshot dates.
     """
-    conn = db.get_connection()
+    conn = db.get_bulk_connection()
 
     # Clear old merged data
     conn.execute("DELETE FROM postal_code_snapshots WHERE source_type = 'merged'")
@@ -274,15 +253,19 @@ def build_merged_snapshots() -> list[str]:
         # Load all relevant snapshots
         dfs = []
         for src, snap_date in available.items():
-            df = pd.read_sql(
+            # Plain cursor rows straight into a DataFrame; read_sql only adds
+            # its SQL-dialect wrapper on top of the same fetch.
+            cursor = conn.execute(
                 """
                 SELECT postal_code, province_abbr, city_name,
                        latitude, longitude, csd_code, address_count
                 FROM postal_code_snapshots
                 WHERE snapshot_date = ? AND source_type = ?
                 """,
-                conn,
-                params=(snap_date, src),
+                (snap_date, src),
+            )
+            df = pd.DataFrame.from_records(
+                cursor.fetchall(), columns=[col[0] for col in cursor.description]
             )
             df["_source"] = src
             dfs.append(df)
@@ -316,11 +299,11 @@ def build_merged_snapshots() -> list[str]:
             "postal_code", "snapshot_date", "source_type", "province_abbr",
             "city_name", "latitude", "longitude", "csd_code", "address_count",
         ]
-        merged[insert_cols].to_sql(
-            "postal_code_snapshots", conn,
-            if_exists="append", index=False, chunksize=5000,
-        )
-        conn.commit()
+        with db.write_transaction(conn):
+            db.bulk_insert(
+                conn, "postal_code_snapshots", insert_cols,
+                merged[insert_cols].itertuples(index=False, name=None),
+            )
 
         merged_dates.append(merged_date)
         logger.info(
@@ -363,15 +346,31 @@ def diff_all_pairs(source_type: str = "nar") -> dict[str, int]:
     db.clear_changes(source_type)
 
     results = {}
-    for i in range(len(dates) - 1):
-        d_before = dates[i]
-        d_after = dates[i + 1]
-        label = f"{d_before}->{d_after}"
-        logger.info("Diffing %s %s", source_type, label)
+    with db.deferred_change_indexes():
+        for n, (d_before, d_after) in enumerate(zip(dates, dates[1:]), start=1):
+            label = f"{d_before}->{d_after}"
+            logger.info("Diffing %s %s", source_type, label)
+
+            count = diff_snapshots(source_type, d_before, d_after)
+            results[label] = count
+            logger.info("  %s: %d changes", label, count)
 
-        changes = diff_snapshots(source_type, d_before, d_after)
-        count = store_changes(changes)
-        results[label] = count
-        logger.info("  %s: %d changes", label, count)
+            if n % CHECKPOINT_EVERY_PAIRS == 0:
+                db.checkpoint(db.get_shared_connection())
 
+    db.rebuild_change_counts(source_type)
+    db.analyze(db.get_shared_connection())
     return results
+
+
+def diff_all_sources(source_types: list[str]) -> dict[str, dict[str, int]]:
+    """Run diff_all_pairs for several sources concurrently.
+
+    Each source only touches its own rows and every call opens its own
+    connections, so one source's city classification overlaps the other's SQLite I/O.
+    Returns {source_type: {pair_label: change_count}}.
+    """
+    if len(source_types) < 2:
+        return {source_type: diff_all_pairs(source_type) for source_type in source_types}
+    with ThreadPoolExecutor(max_workers=len(source_types)) as executor:
+        return dict(zip(source_types, executor.map(diff_all_pairs, source_types)))
@@ -1,6 +1,10 @@
 """Download NAR ZIPs, Geocoder.ca, and GeoNames data files."""
 
+import hashlib
+import json
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -10,6 +14,8 @@ from tqdm import tqdm
 from src import db
 from src.config import (
     GEONAMES_URL,
+    NAR_BY_PERIOD,
+    NAR_DOWNLOAD_WORKERS,
     NAR_SNAPSHOTS,
     RAW_GEOCODER_DIR,
     RAW_GEONAMES_DIR,
@@ -17,20 +23,131 @@ from src.config import (
 )
 
 
-def _download_file(url: str, dest: Path, description: str = "") -> Path:
-    """Stream-download a file with a progress bar. Returns the dest path."""
+HTTP_CACHE_NAME = ".http_cache.json"
+
+# Serializes read-modify-write of the validator cache across download threads
+_http_cache_lock = threading.Lock()
+
+# One requests.Session per download thread: keep-alive reuses the TCP/TLS
+# connection across files from the same host, and sessions aren't documented
+# as thread-safe, so each thread keeps its own
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _load_http_cache(directory: Path) -> dict[str, dict]:
+    """Return the {url: {etag, last_modified, size}} validator cache for a directory."""
+    path = directory / HTTP_CACHE_NAME
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def _save_http_validators(directory: Path, url: str, headers) -> dict:
+    """Record the ETag / Last-Modified / size the server sent for a URL."""
+    entry = {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "size": int(headers["Content-Length"]) if "Content-Length" in headers else None,
+    }
+    with _http_cache_lock:
+        cache = _load_http_cache(directory)
+        cache[url] = entry
+        (directory / HTTP_CACHE_NAME).write_text(
+            json.dumps(cache, indent=2), encoding="utf-8"
+        )
+    return entry
+
+
+# Bytes per read from the response stream (and per progress/hash update)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _update_from_file(digest, path: Path) -> None:
+    """Feed a file's current contents into a hashlib digest."""
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(block)
+
+
+def _download_file(
+    url: str,
+    dest: Path,
+    description: str = "",
+    position: int | None = None,
+    sha256: str | None = None,
+) -> Path:
+    """Stream-download a file with a progress bar. Returns the dest path.
+
+    Data is written to ``<dest>.part`` and renamed into place when complete,
+    so an interrupted download is never mistaken for a finished one. If a
+    ``.part`` file exists, the download resumes with an HTTP Range request
+    guarded by If-Range on the ETag/Last-Modified seen when it started; if
+    the remote file changed, the server sends the full body and we restart.
+
+    ``position`` pins the progress bar to a terminal line so concurrent
+    downloads don't overwrite each other's bars; bars are hidden when stderr
+    is not a terminal. If ``sha256`` is given the download is hashed as it
+    streams (a resumed ``.part`` is hashed up front) and verified when done.
+    """
     dest.parent.mkdir(parents=True, exist_ok=True)
-    resp = requests.get(url, stream=True, timeout=60)
+    part = dest.with_name(dest.name + ".part")
+
+    headers = {}
+    offset = part.stat().st_size if part.exists() else 0
+    validators = _load_http_cache(dest.parent).get(url, {})
+    if_range = validators.get("etag") or validators.get("last_modified")
+    if offset and if_range:
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = if_range
+
+    resp = _session().get(url, headers=headers, stream=True, timeout=60)
+    if resp.status_code == 416:
+        # Nothing left to fetch for this range, so the .part can't be trusted
+        resp.close()
+        part.unlink()
+        return _download_file(url, dest, description, position, sha256)
     resp.raise_for_status()
-    total = int(resp.headers.get("content-length", 0))
+
+    digest = hashlib.sha256() if sha256 else None
+    if resp.status_code == 206:
+        mode = "ab"
+        total = offset + int(resp.headers.get("content-length", 0))
+        if digest is not None:
+            _update_from_file(digest, part)
+    else:
+        mode, offset = "wb", 0
+        total = int(resp.headers.get("content-length", 0))
+        _save_http_validators(dest.parent, url, resp.headers)
+
     label = description or dest.name
     with (
-        open(dest, "wb") as f,
-        tqdm(total=total, unit="B", unit_scale=True, desc=label) as bar,
+        open(part, mode) as f,
+        tqdm(
+            total=total, initial=offset, unit="B", unit_scale=True,
+            desc=label, position=position, disable=None,
+        ) as bar,
     ):
-        for chunk in resp.iter_content(chunk_size=1024 * 256):
+        for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
             f.write(chunk)
+            if digest is not None:
+                digest.update(chunk)
             bar.update(len(chunk))
+
+    if digest is not None and digest.hexdigest() != sha256.lower():
+        part.unlink()
+        raise ValueError(f"SHA-256 mismatch for {url}; discarded partial download")
+
+    part.replace(dest)
     return dest
 
 
@@ -42,51 +159,55 @@ def _extract_zip(zip_path: Path, extract_dir: Path) -> list[Path]:
         return [extract_dir / name for name in zf.namelist()]
 
 
-def download_nar(period: str) -> Path | None:
-    """Download a single NAR snapshot ZIP. Returns path to extracted dir or None."""
-    info = NAR_SNAPSHOTS.get(period)
-    if not info:
+def download_nar(period: str, position: int | None = None) -> Path | None:
+    """Download a single NAR snapshot ZIP. Returns the ZIP path.
+
+    The ZIP is not extracted: parser_nar streams the Address CSVs out of it.
+    """
+    snapshot = NAR_BY_PERIOD.get(period)
+    if not snapshot:
         raise ValueError(
             f"Unknown NAR period: {period!r}. "
-            f"Available: {', '.join(NAR_SNAPSHOTS)}"
+            f"Available: {', '.join(NAR_BY_PERIOD)}"
         )
 
     zip_path = RAW_NAR_DIR / f"{period}.zip"
-    extract_dir = RAW_NAR_DIR / period
 
     if zip_path.exists():
         print(f"  Already downloaded: {zip_path}")
     else:
         print(f"  Downloading NAR {period} ...")
-        _download_file(info["url"], zip_path, description=f"NAR {period}")
-
-    # Extract if not already done
-    if not extract_dir.exists() or not any(extract_dir.iterdir()):
-        print(f"  Extracting to {extract_dir} ...")
-        _extract_zip(zip_path, extract_dir)
-    else:
-        print(f"  Already extracted: {extract_dir}")
+        _download_file(
+            snapshot.url,
+            zip_path,
+            description=f"NAR {period}",
+            position=position,
+            sha256=snapshot.sha256,
+        )
 
     # Record in database
     db.init_db()
     db.record_download(
         source_type="nar",
-        reference_date=info["reference_date"],
-        download_url=info["url"],
-        file_path=str(extract_dir),
+        reference_date=snapshot.reference_date,
+        download_url=snapshot.url,
+        file_path=str(zip_path),
     )
 
-    return extract_dir
+    return zip_path
+
 
+def download_all_nar(max_workers: int = NAR_DOWNLOAD_WORKERS) -> list[Path]:
+    """Download all known NAR snapshots concurrently.
 
-def download_all_nar() -> list[Path]:
-    """Download all known NAR snapshots."""
-    results = []
-    for period in NAR_SNAPSHOTS:
-        path = download_nar(period)
-        if path:
-            results.append(path)
-    return results
+    Downloads are network-bound, so a small thread pool overlaps the waits.
+    Results are returned in NAR_SNAPSHOTS order.
+    """
+    periods = [snapshot.period for snapshot in NAR_SNAPSHOTS]
+    db.init_db()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(periods))) as executor:
+        paths = list(executor.map(download_nar, periods, range(len(periods))))
+    return [path for path in paths if path]
 
 
 def download_geocoder() -> Path | None:
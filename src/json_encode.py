@@ -0,0 +1,22 @@
+"""JSON encoding for exports, the static site and API responses."""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    # orjson is an optional speedup (the "speedups" extra)
+    orjson = None
+
+
+def dumps(data: object, indent: bool = False) -> bytes:
+    """Encode ``data`` as UTF-8 JSON: compact, or with 2-space indentation.
+
+    orjson encodes in C when installed; the json fallback produces the same
+    text (non-ASCII characters are written as is, not escaped).
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
@@ -0,0 +1,56 @@
+"""Reuse a parsed source DataFrame across runs while its file is unchanged."""
+
+import json
+import logging
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+from src.config import PROCESSED_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def _source_key(source: Path, version: int) -> str:
+    stat = source.stat()
+    return f"{source.name}:{stat.st_mtime_ns}:{stat.st_size}:v{version}"
+
+
+def cached_parse(
+    source: Path,
+    name: str,
+    parse: Callable[[Path], pd.DataFrame],
+    version: int,
+    force: bool = False,
+) -> pd.DataFrame:
+    """Return ``parse(source)``, reusing ``PROCESSED_DIR/<name>.parquet`` if fresh.
+
+    The parquet is reused while ``<name>.meta.json`` records the same source
+    file name, mtime and size and the same parser ``version``; ``force``
+    always re-parses. The cache cannot see code changes, so a parser bumps
+    its version whenever its output changes. The meta file is removed before
+    the parquet is rewritten, so an interrupted write is never mistaken for
+    a valid cache.
+    """
+    parquet_path = PROCESSED_DIR / f"{name}.parquet"
+    meta_path = PROCESSED_DIR / f"{name}.meta.json"
+    key = _source_key(source, version)
+
+    if not force and parquet_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = {}
+        if meta.get("cache_key") == key:
+            logger.info("%s unchanged, reusing %s", source.name, parquet_path.name)
+            return pd.read_parquet(parquet_path)
+
+    df = parse(source)
+
+    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+    meta_path.unlink(missing_ok=True)
+    df.to_parquet(parquet_path, index=False, compression="zstd", compression_level=3)
+    meta_path.write_text(json.dumps({"cache_key": key}), encoding="utf-8")
+    logger.info("Saved %s", parquet_path)
+    return df
@@ -0,0 +1,38 @@
+"""Postal code cleanup shared by the Geocoder.ca and GeoNames parsers."""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.config import NUNAVUT_FSAS
+
+_NUNAVUT_FSAS = pa.array(sorted(NUNAVUT_FSAS), type=pa.string())
+
+
+def clean_postal_codes(postal_codes: pd.Series) -> pd.Series:
+    """Remove spaces and upper-case; missing codes stay missing.
+
+    Runs as Arrow string kernels, since pandas 2's object-dtype .str methods
+    loop in Python.
+    """
+    codes = pa.array(postal_codes, type=pa.string(), from_pandas=True)
+    return pd.Series(
+        pc.utf8_upper(pc.replace_substring(codes, " ", "")).to_pandas(),
+        index=postal_codes.index,
+        dtype=postal_codes.dtype,
+    )
+
+
+def nunavut_masks(postal_codes: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Return (is_nu, is_nt) masks for the territories' X postal codes.
+
+    X codes are Nunavut when their FSA is in NUNAVUT_FSAS and the Northwest
+    Territories otherwise; both masks are False for every other code.
+    """
+    codes = pa.array(postal_codes, type=pa.string(), from_pandas=True)
+    is_x = pc.starts_with(codes, "X").to_numpy(zero_copy_only=False)
+    in_nu = pc.is_in(
+        pc.utf8_slice_codeunits(codes, 0, 3), value_set=_NUNAVUT_FSAS
+    ).to_numpy(zero_copy_only=False)
+    return is_x & in_nu, is_x & ~in_nu
@@ -6,10 +6,16 @@ from pathlib import Path
 import pandas as pd
 
 from src import db
-from src.config import NUNAVUT_FSAS, RAW_GEOCODER_DIR
+from src.config import RAW_GEOCODER_DIR
+from src.parse_cache import cached_parse
+from src.parser_common import clean_postal_codes, nunavut_masks
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever parse_geocoder_csv's columns or values change, so
+# parquets cached by parse_cache.cached_parse are re-parsed
+GEOCODER_PARSE_VERSION = 1
+
 
 def find_latest_geocoder_csv() -> Path | None:
     """Find the most recent Geocoder.ca CSV in the raw directory."""
@@ -48,9 +54,7 @@ def parse_geocoder_csv(csv_path: Path) -> pd.DataFrame:
         )
 
     # Clean postal code
-    df["postal_code"] = (
-        df["postal_code"].str.replace(" ", "", regex=False).str.upper()
-    )
+    df["postal_code"] = clean_postal_codes(df["postal_code"])
     df = df.dropna(subset=["postal_code"])
 
     # Convert lat/lon to float
@@ -64,10 +68,9 @@ def parse_geocoder_csv(csv_path: Path) -> pd.DataFrame:
         df["province_abbr"] = None
 
     # Disambiguate NU vs NT for X codes
-    mask_x = df["postal_code"].str[0] == "X"
-    mask_nu = df["postal_code"].str[:3].isin(NUNAVUT_FSAS)
-    df.loc[mask_x & mask_nu, "province_abbr"] = "NU"
-    df.loc[mask_x & ~mask_nu, "province_abbr"] = "NT"
+    is_nu, is_nt = nunavut_masks(df["postal_code"])
+    df.loc[is_nu, "province_abbr"] = "NU"
+    df.loc[is_nt, "province_abbr"] = "NT"
 
     if "city_name" in df.columns:
         df["city_name"] = df["city_name"].str.strip().str.title()
@@ -99,16 +102,15 @@ def process_geocoder(csv_path: Path | None = None, force: bool = False) -> int:
     # Derive snapshot date from filename (YYYY-MM-DD.csv)
     snapshot_date = csv_path.stem  # e.g., "2026-02-01"
 
-    df = parse_geocoder_csv(csv_path)
+    df = cached_parse(
+        csv_path, "geocoder_unique", parse_geocoder_csv,
+        version=GEOCODER_PARSE_VERSION, force=force,
+    )
     logger.info("Geocoder.ca: %d unique postal codes from %s", len(df), csv_path.name)
 
     # Store in database
     db.init_db()
-    conn = db.get_connection()
-    conn.execute(
-        "DELETE FROM postal_code_snapshots WHERE snapshot_date = ? AND source_type = 'geocoder'",
-        (snapshot_date,),
-    )
+    conn = db.get_bulk_connection()
 
     df["snapshot_date"] = snapshot_date
     df["source_type"] = "geocoder"
@@ -117,12 +119,12 @@ def process_geocoder(csv_path: Path | None = None, force: bool = False) -> int:
         "postal_code", "snapshot_date", "source_type", "province_abbr",
         "city_name", "latitude", "longitude", "csd_code", "address_count",
     ]
-    df[insert_cols].to_sql(
-        "postal_code_snapshots", conn, if_exists="append",
-        index=False, chunksize=5000,
-    )
-    conn.commit()
+    with db.write_transaction(conn):
+        db.load_snapshot(
+            conn, "geocoder", snapshot_date, insert_cols,
+            df[insert_cols].itertuples(index=False, name=None),
+        )
+        db.mark_processed("geocoder", snapshot_date, len(df), len(df), conn=conn)
     conn.close()
 
-    db.mark_processed("geocoder", snapshot_date, len(df), len(df))
     return len(df)
@@ -6,10 +6,16 @@ from pathlib import Path
 import pandas as pd
 
 from src import db
-from src.config import NUNAVUT_FSAS, RAW_GEONAMES_DIR
+from src.config import RAW_GEONAMES_DIR
+from src.parse_cache import cached_parse
+from src.parser_common import clean_postal_codes, nunavut_masks
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever parse_geonames's columns or values change, so
+# parquets cached by parse_cache.cached_parse are re-parsed
+GEONAMES_PARSE_VERSION = 1
+
 # GeoNames columns (tab-delimited, no header)
 GEONAMES_COLUMNS = [
     "country_code",
@@ -50,9 +56,7 @@ def parse_geonames(file_path: Path) -> pd.DataFrame:
     )
 
     # Clean postal code: GeoNames includes a space (e.g., "M5V 1J2")
-    df["postal_code"] = (
-        df["postal_code"].str.replace(" ", "", regex=False).str.upper()
-    )
+    df["postal_code"] = clean_postal_codes(df["postal_code"])
     df = df.dropna(subset=["postal_code"])
 
     # Convert lat/lon
@@ -63,10 +67,9 @@ def parse_geonames(file_path: Path) -> pd.DataFrame:
     df["province_abbr"] = df["admin_code1"].str.strip().str.upper()
 
     # Disambiguate NU vs NT
-    mask_x = df["postal_code"].str[0] == "X"
-    mask_nu = df["postal_code"].str[:3].isin(NUNAVUT_FSAS)
-    df.loc[mask_x & mask_nu, "province_abbr"] = "NU"
-    df.loc[mask_x & ~mask_nu, "province_abbr"] = "NT"
+    is_nu, is_nt = nunavut_masks(df["postal_code"])
+    df.loc[is_nu, "province_abbr"] = "NU"
+    df.loc[is_nt, "province_abbr"] = "NT"
 
     # City name
     df["city_name"] = df["place_name"].str.strip().str.title()
@@ -96,14 +99,14 @@ def process_geonames(file_path: Path | None = None, force: bool = False) -> int:
 
     snapshot_date = datetime.now().strftime("%Y-%m-%d")
 
-    df = parse_geonames(file_path)
+    df = cached_parse(
+        file_path, "geonames_unique", parse_geonames,
+        version=GEONAMES_PARSE_VERSION, force=force,
+    )
     logger.info("GeoNames: %d unique postal codes from %s", len(df), file_path.name)
 
     db.init_db()
-    conn = db.get_connection()
-    conn.execute(
-        "DELETE FROM postal_code_snapshots WHERE source_type = 'geonames'",
-    )
+    conn = db.get_bulk_connection()
 
     df["snapshot_date"] = snapshot_date
     df["source_type"] = "geonames"
@@ -112,12 +115,17 @@ def process_geonames(file_path: Path | None = None, force: bool = False) -> int:
         "postal_code", "snapshot_date", "source_type", "province_abbr",
         "city_name", "latitude", "longitude", "csd_code", "address_count",
     ]
-    df[insert_cols].to_sql(
-        "postal_code_snapshots", conn, if_exists="append",
-        index=False, chunksize=5000,
-    )
-    conn.commit()
+    with db.write_transaction(conn):
+        # Only one GeoNames snapshot is kept; earlier days' loads are dropped
+        conn.execute(
+            "DELETE FROM postal_code_snapshots WHERE source_type = 'geonames' AND snapshot_date != ?",
+            (snapshot_date,),
+        )
+        db.load_snapshot(
+            conn, "geonames", snapshot_date, insert_cols,
+            df[insert_cols].itertuples(index=False, name=None),
+        )
+        db.mark_processed("geonames", snapshot_date, len(df), len(df), conn=conn)
     conn.close()
 
-    db.mark_processed("geonames", snapshot_date, len(df), len(df))
     return len(df)
@@ -10,14 +10,24 @@ We skip these for now — lat/lon can be backfilled from Geocoder.ca or GeoNames
 
 import logging
 import os
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from pathlib import Path
-
+import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from itertools import repeat
+from pathlib import Path, PurePosixPath
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
 from src import db
 from src.config import (
     FSA_FIRST_LETTER_TO_PROVINCE,
+    NAR_BY_PERIOD,
     NAR_CHUNK_SIZE,
     NAR_SNAPSHOTS,
     NUNAVUT_FSAS,
@@ -39,6 +49,45 @@ NAR_COL_MAP = {
 
 NAR_USECOLS = list(NAR_COL_MAP.keys())
 
+# Per-postal-code attributes kept from the first row that has a value
+_FIRST_COLUMNS = ["province_code", "province_abbr_raw", "city_name", "csd_name"]
+
+# Low-cardinality attributes, dictionary-encoded in each per-file result (and
+# so handed to pandas as categoricals): ~13 province values and a few thousand
+# CSD names across ~900k postal codes
+_CATEGORICAL_COLUMNS = ["province_code", "province_abbr_raw", "csd_name"]
+
+# postal_code_snapshots columns loaded per snapshot; _NAR_VALUE_COLUMNS are the
+# ones taken from the parsed table (postal_code plus everything but the
+# snapshot_date/source_type constants)
+_NAR_INSERT_COLUMNS = [
+    "postal_code",
+    "snapshot_date",
+    "source_type",
+    "province_abbr",
+    "city_name",
+    "latitude",
+    "longitude",
+    "csd_code",
+    "address_count",
+]
+_NAR_VALUE_COLUMNS = [c for c in _NAR_INSERT_COLUMNS if c not in ("snapshot_date", "source_type")]
+
+# Rows converted to Python values at a time while loading a snapshot
+_INSERT_BATCH_ROWS = 65_536
+
+# pandas' default NA strings, so fields read as missing exactly as they were
+# under read_csv(dtype=str)
+_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
+
+# An Address CSV on disk, or a (zip_path, member_name) read straight out of
+# the downloaded snapshot ZIP
+CsvSource = Path | tuple[Path, str]
+
 
 def _find_address_csvs(extract_dir: Path) -> list[Path]:
     """Find all Address CSV files inside an extracted NAR directory.
@@ -59,111 +108,310 @@ def _find_address_csvs(extract_dir: Path) -> list[Path]:
     return csvs
 
 
-def _normalize_province(province_code: str, province_abbr: str, postal_code: str) -> str:
-    """Derive the best 2-letter province abbreviation (scalar version)."""
-    abbr = str(province_abbr).strip().upper() if pd.notna(province_abbr) else ""
-    if len(abbr) != 2:
-        abbr = PROVINCE_CODE_TO_ABBR.get(str(province_code).strip(), "")
-    if not abbr and pd.notna(postal_code) and len(str(postal_code)) >= 1:
-        abbr = FSA_FIRST_LETTER_TO_PROVINCE.get(str(postal_code)[0].upper(), "")
-    if abbr == "NT" and pd.notna(postal_code) and len(str(postal_code)) >= 3:
-        if str(postal_code)[:3].upper() in NUNAVUT_FSAS:
-            abbr = "NU"
-    return abbr
+def _find_zip_address_csvs(zip_path: Path) -> list[tuple[Path, str]]:
+    """Find the Address CSV members of a snapshot ZIP, as _find_address_csvs does.
+
+    Members are returned largest (uncompressed) first.
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        sizes = {PurePosixPath(info.filename): info.file_size for info in zf.infolist()}
+    members = list(sizes)
+    csvs = [
+        m for m in members
+        if len(m.parts) == 2 and m.parts[0].lower() == "addresses" and m.match("*.csv")
+    ]
+    if not csvs:
+        csvs = [m for m in members if m.match("*ddress*.csv")]
+    if not csvs:
+        raise FileNotFoundError(f"No Address CSVs found in {zip_path}")
+    csvs = sorted(sorted(csvs), key=sizes.__getitem__, reverse=True)
+    return [(zip_path, str(m)) for m in csvs]
+
+
+def _address_csv_sources(period: str) -> list[CsvSource]:
+    """Return a period's Address CSVs, preferring the ZIP over an extracted dir.
+
+    Reading members straight from the ZIP saves writing the extracted CSVs to
+    disk and reading them back; directories extracted by older downloads are
+    still used when no ZIP is present.
+
+    Sources come largest first, so the process pool starts the big provinces
+    (ON, QC) right away and the small files fill in around them instead of
+    one big file running alone at the end.
+    """
+    zip_path = RAW_NAR_DIR / f"{period}.zip"
+    if zip_path.exists():
+        return _find_zip_address_csvs(zip_path)
+    extract_dir = RAW_NAR_DIR / period
+    if extract_dir.exists():
+        csvs = _find_address_csvs(extract_dir)
+        return sorted(csvs, key=lambda path: path.stat().st_size, reverse=True)
+    raise FileNotFoundError(
+        f"NAR data not downloaded for {period}. Run 'download' first."
+    )
+
+
+def _source_name(csv_source: CsvSource) -> str:
+    if isinstance(csv_source, tuple):
+        return PurePosixPath(csv_source[1]).name
+    return csv_source.name
+
+
+def _per_category(values: pd.Series, resolve) -> np.ndarray:
+    """Return resolve(value) for every row, calling it once per distinct value.
+
+    Rows are mapped through their category codes into a lookup table, so a
+    column with a dozen distinct values costs a dozen calls plus one gather.
+    Missing values map to "".
+    """
+    values = values.astype("category")
+    table = np.array([resolve(v) for v in values.cat.categories] + [""], dtype=object)
+    # Missing values have code -1, which picks the trailing ""
+    return table[values.cat.codes.to_numpy()]
+
+
+def _clean_abbr(value: str) -> str:
+    abbr = value.strip().upper()
+    return abbr if len(abbr) == 2 else ""
+
+
+def _code_to_abbr(value: str) -> str:
+    return PROVINCE_CODE_TO_ABBR.get(value.strip(), "")
 
 
 def _normalize_province_vectorized(df: pd.DataFrame) -> pd.Series:
     """Vectorized province normalization. Operates on the full DataFrame at once."""
     # Stage 1: Try province_abbr_raw (strip + uppercase, keep only 2-char values)
-    raw = df["province_abbr_raw"].fillna("").str.strip().str.upper()
-    abbr = raw.where(raw.str.len() == 2, other="")
+    abbr = _per_category(df["province_abbr_raw"], _clean_abbr)
 
+    # Stages 2-3 only map the rows still missing an abbreviation; most NAR rows
+    # carry a usable MAIL_PROV_ABVN, so the fallbacks touch a small subset.
     # Stage 2: Where abbr is empty, fall back to numeric province_code mapping
-    code_mapped = df["province_code"].fillna("").str.strip().map(PROVINCE_CODE_TO_ABBR).fillna("")
     mask_empty = abbr == ""
-    abbr = abbr.where(~mask_empty, other=code_mapped)
+    if mask_empty.any():
+        abbr[mask_empty] = _per_category(
+            df.loc[mask_empty, "province_code"], _code_to_abbr
+        )
 
-    # Stage 3: Where still empty, fall back to first letter of postal_code
-    first_letter = df["postal_code"].str[0].str.upper()
-    letter_mapped = first_letter.map(FSA_FIRST_LETTER_TO_PROVINCE).fillna("")
+    # Stage 3: Where still empty, fall back to first letter of postal_code.
+    # Postal codes are upper-cased in _parse_single_csv.
     mask_still_empty = abbr == ""
-    abbr = abbr.where(~mask_still_empty, other=letter_mapped)
+    if mask_still_empty.any():
+        abbr[mask_still_empty] = (
+            df.loc[mask_still_empty, "postal_code"]
+            .str[0].map(FSA_FIRST_LETTER_TO_PROVINCE).fillna("").to_numpy()
+        )
+
+    # Stage 4: Nunavut disambiguation -- where abbr=="NT" and FSA is in
+    # NUNAVUT_FSAS; only the (few) NT rows have their FSA sliced
+    is_nunavut = abbr == "NT"
+    if is_nunavut.any():
+        is_nunavut[is_nunavut] = (
+            df.loc[is_nunavut, "postal_code"].str[:3].isin(NUNAVUT_FSAS).to_numpy()
+        )
+        abbr[is_nunavut] = "NU"
+
+    return pd.Series(abbr, index=df.index)
 
-    # Stage 4: Nunavut disambiguation -- where abbr=="NT" and FSA is in NUNAVUT_FSAS
-    fsa = df["postal_code"].str[:3].str.upper()
-    is_nunavut = (abbr == "NT") & fsa.isin(NUNAVUT_FSAS)
-    abbr = abbr.where(~is_nunavut, other="NU")
 
-    return abbr
+def _open_csv_source(stack: ExitStack, csv_source: CsvSource):
+    """Open a CsvSource for reading; ZIP members are decompressed as they are read."""
+    if isinstance(csv_source, tuple):
+        zip_path, member = csv_source
+        zf = stack.enter_context(zipfile.ZipFile(zip_path))
+        return stack.enter_context(zf.open(member))
+    return csv_source
 
 
-def _parse_single_csv(csv_path: Path, chunk_size: int) -> tuple[list[pd.DataFrame], int]:
-    """Parse a single NAR CSV file into aggregated chunks.
+def _read_csv_chunks(csv_source: CsvSource, chunk_size: int) -> Iterator[pa.Table]:
+    """Stream NAR_USECOLS from a CSV as string tables of ~chunk_size rows.
 
-    Must be a module-level function (picklable for ProcessPoolExecutor on Windows).
-    Returns (list_of_aggregated_dataframes, total_row_count).
+    Each file is read on the calling thread (parse_nar_snapshot already runs
+    one thread per file); batches are regrouped so aggregation still sees
+    chunk_size rows at a time. Raises pa.ArrowInvalid on a row whose field
+    count differs from the header's.
+    """
+    with ExitStack() as stack:
+        reader = pacsv.open_csv(
+            _open_csv_source(stack, csv_source),
+            read_options=pacsv.ReadOptions(encoding="latin-1", use_threads=False),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=NAR_USECOLS,
+                column_types=dict.fromkeys(NAR_USECOLS, pa.string()),
+                strings_can_be_null=True,
+                null_values=_NA_VALUES,
+            ),
+        )
+        pending: list[pa.RecordBatch] = []
+        pending_rows = 0
+        for batch in reader:
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= chunk_size:
+                yield pa.Table.from_batches(pending)
+                pending, pending_rows = [], 0
+        if pending_rows:
+            yield pa.Table.from_batches(pending)
+
+
+def _read_csv_chunks_pandas(csv_source: CsvSource, chunk_size: int) -> Iterator[pa.Table]:
+    """_read_csv_chunks through pd.read_csv, for files with malformed rows.
+
+    read_csv(usecols=...) keeps rows with missing fields (padded with NaN) and
+    with extra trailing fields (ignored); Arrow's reader can do neither.
+    """
+    schema = pa.schema([(name, pa.string()) for name in NAR_USECOLS])
+    with ExitStack() as stack:
+        for chunk in pd.read_csv(
+            _open_csv_source(stack, csv_source),
+            usecols=NAR_USECOLS,
+            dtype=str,
+            chunksize=chunk_size,
+            encoding="latin-1",
+            encoding_errors="replace",
+            on_bad_lines="skip",
+        ):
+            yield pa.Table.from_pandas(chunk[NAR_USECOLS], schema=schema, preserve_index=False)
+
+
+def _group_first(table: pa.Table, count: tuple[str, str]) -> pa.Table:
+    """Group by postal_code, keeping the first non-null _FIRST_COLUMNS value.
+
+    count is the (column, aggregation) that becomes address_count. Groups come
+    out in order of first appearance (single-threaded grouper), like
+    groupby(sort=False).
+
+    Arrow's "first" is slow on strings (it copies every group's value), so the
+    grouping runs on row numbers instead: a column's first non-null row is the
+    "min" row number with that column's nulls masked out, and the strings are
+    then gathered with one take() per column. Columns without nulls all share
+    the group's first row (its representative row), aggregated once.
     """
+    rows = pa.array(np.arange(table.num_rows, dtype=np.int64))
+    no_row = pa.scalar(None, pa.int64())
+    columns = {"postal_code": table["postal_code"]}
+    first_row = {}
+    for column in _FIRST_COLUMNS:
+        if table[column].null_count:
+            columns[column] = pc.if_else(pc.is_valid(table[column]), rows, no_row)
+            first_row[column] = column
+        else:
+            columns["_row"] = rows
+            first_row[column] = "_row"
+    if count[0] != "postal_code":
+        columns[count[0]] = table[count[0]]
+
+    grouped = pa.table(columns).group_by("postal_code", use_threads=False).aggregate(
+        [(key, "min") for key in dict.fromkeys(first_row.values())] + [count]
+    )
+    return pa.table(
+        [grouped["postal_code"]]
+        + [table[column].take(grouped[f"{first_row[column]}_min"]) for column in _FIRST_COLUMNS]
+        + [grouped["_".join(count)]],
+        names=["postal_code"] + _FIRST_COLUMNS + ["address_count"],
+    )
+
+
+def _parse_single_csv(
+    csv_source: CsvSource, chunk_size: int
+) -> tuple[pa.Table | None, int]:
+    """Parse a single NAR CSV file into one row per postal code.
+
+    Cleaning and aggregation run as Arrow compute kernels, which release the
+    GIL, so files parse in parallel on threads; chunk aggregates are folded
+    into a single per-file table. A file with malformed rows is re-read
+    through pandas, so those rows are kept as read_csv keeps them.
+    Returns (aggregated_table or None if the file had no valid rows, total_row_count).
+    """
+    try:
+        return _aggregate_chunks(_read_csv_chunks(csv_source, chunk_size))
+    except pa.ArrowInvalid as exc:
+        name = csv_source[1] if isinstance(csv_source, tuple) else csv_source.name
+        logger.warning("%s: %s; re-reading it with pandas", name, exc)
+        return _aggregate_chunks(_read_csv_chunks_pandas(csv_source, chunk_size))
+
+
+def _aggregate_chunks(chunks: Iterable[pa.Table]) -> tuple[pa.Table | None, int]:
     aggregated = []
     row_count = 0
 
-    for chunk in pd.read_csv(
-        csv_path,
-        usecols=NAR_USECOLS,
-        dtype=str,
-        chunksize=chunk_size,
-        encoding="latin-1",
-        encoding_errors="replace",
-        on_bad_lines="skip",
-    ):
-        row_count += len(chunk)
-        chunk = chunk.rename(columns=NAR_COL_MAP)
-
-        # Clean postal code: strip spaces, uppercase
-        chunk["postal_code"] = (
-            chunk["postal_code"]
-            .str.replace(" ", "", regex=False)
-            .str.upper()
-            .str.strip()
+    for chunk in chunks:
+        row_count += chunk.num_rows
+        chunk = chunk.rename_columns([NAR_COL_MAP[name] for name in chunk.column_names])
+
+        # Clean postal code: strip spaces, uppercase; keep 6-character codes
+        # (null codes compare as null and are dropped by the filter)
+        postal_code = pc.utf8_trim_whitespace(
+            pc.utf8_upper(pc.replace_substring(chunk["postal_code"], " ", ""))
         )
-        chunk = chunk.dropna(subset=["postal_code"])
-        chunk = chunk[chunk["postal_code"].str.len() == 6]
+        chunk = chunk.set_column(
+            chunk.schema.get_field_index("postal_code"), "postal_code", postal_code
+        ).filter(pc.equal(pc.utf8_length(postal_code), 6))
 
-        if chunk.empty:
+        if chunk.num_rows == 0:
             continue
 
-        grouped = (
-            chunk.groupby("postal_code", sort=False)
-            .agg(
-                province_code=("province_code", "first"),
-                province_abbr_raw=("province_abbr_raw", "first"),
-                city_name=("city_name", "first"),
-                csd_name=("csd_name", "first"),
-                address_count=("postal_code", "size"),
-            )
-            .reset_index()
-        )
-        aggregated.append(grouped)
+        aggregated.append(_group_first(chunk, ("postal_code", "count")))
 
-    return aggregated, row_count
+    if not aggregated:
+        return None, row_count
+    if len(aggregated) == 1:
+        result = aggregated[0]
+    else:
+        result = _group_first(pa.concat_tables(aggregated), ("address_count", "sum"))
+    # Smaller to hold, concatenate and re-aggregate across files;
+    # _group_first gathers values with take(), which works on dictionaries too
+    for column in _CATEGORICAL_COLUMNS:
+        index = result.schema.get_field_index(column)
+        result = result.set_column(index, column, pc.dictionary_encode(result[column]))
+    return result, row_count
+
+
+def _map_distinct(column: pa.ChunkedArray, transform) -> pa.ChunkedArray:
+    """Apply a string transform to each distinct value once, then gather per row.
+
+    City names repeat ~200x across postal codes, so dictionary-encoding first
+    and transforming only the dictionary is several times cheaper than running
+    the kernels over every row. Nulls stay null.
+    """
+    encoded = pc.dictionary_encode(column)
+    return pa.chunked_array(
+        [transform(chunk.dictionary).take(chunk.indices) for chunk in encoded.chunks],
+        type=column.type,
+    )
+
+
+def _combine_files(tables: list[pa.Table]) -> pa.Table:
+    """Concatenate per-file aggregates, re-aggregating only codes found in several.
+
+    NAR files are split by province, so nearly every postal code appears in
+    one file only; those rows pass through as-is and only the few codes that
+    span files are grouped again (they end up after the others).
+    """
+    combined = pa.concat_tables(tables)
+    counts = pc.value_counts(combined["postal_code"])
+    shared = counts.field("values").filter(pc.greater(counts.field("counts"), 1))
+    if len(shared) == 0:
+        return combined
+    in_several = pc.is_in(combined["postal_code"], value_set=shared)
+    return pa.concat_tables([
+        combined.filter(pc.invert(in_several)),
+        _group_first(combined.filter(in_several), ("address_count", "sum")),
+    ])
 
 
 def parse_nar_snapshot(period: str) -> pd.DataFrame:
     """Parse all NAR Address CSVs for a snapshot into unique postal codes.
 
-    Uses ProcessPoolExecutor to parse CSV files in parallel.
+    Uses a ThreadPoolExecutor to parse CSV files in parallel: the work is in
+    Arrow's C++ reader and kernels, and the per-file tables stay in this
+    process instead of being pickled back from worker processes.
     Returns a DataFrame with one row per unique postal code.
     """
-    info = NAR_SNAPSHOTS.get(period)
-    if not info:
+    if period not in NAR_BY_PERIOD:
         raise ValueError(f"Unknown NAR period: {period!r}")
 
-    extract_dir = RAW_NAR_DIR / period
-    if not extract_dir.exists():
-        raise FileNotFoundError(
-            f"NAR data not downloaded for {period}. Run 'download' first."
-        )
-
-    csv_files = _find_address_csvs(extract_dir)
+    csv_files = _address_csv_sources(period)
     logger.info("Parsing NAR %s: %d CSV files", period, len(csv_files))
 
     all_aggregated = []
@@ -171,48 +419,50 @@ def parse_nar_snapshot(period: str) -> pd.DataFrame:
 
     # Parse CSV files in parallel across CPU cores
     max_workers = min(len(csv_files), os.cpu_count() or 4)
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {
-            executor.submit(_parse_single_csv, csv_path, NAR_CHUNK_SIZE): csv_path
-            for csv_path in csv_files
+            executor.submit(_parse_single_csv, csv_source, NAR_CHUNK_SIZE): csv_source
+            for csv_source in csv_files
         }
         for future in as_completed(futures):
-            csv_path = futures[future]
+            csv_source = futures[future]
             aggregated, row_count = future.result()
-            logger.info("  Completed %s (%d rows)", csv_path.name, row_count)
-            all_aggregated.extend(aggregated)
+            logger.info("  Completed %s (%d rows)", _source_name(csv_source), row_count)
+            if aggregated is not None:
+                all_aggregated.append(aggregated)
             total_rows += row_count
 
     if not all_aggregated:
         raise ValueError(f"No data found in NAR CSVs for {period}")
 
-    # Combine all chunks across all files and re-aggregate
-    combined = pd.concat(all_aggregated, ignore_index=True)
-
-    final = (
-        combined.groupby("postal_code", sort=False)
-        .agg(
-            province_code=("province_code", "first"),
-            province_abbr_raw=("province_abbr_raw", "first"),
-            city_name=("city_name", "first"),
-            csd_name=("csd_name", "first"),
-            address_count=("address_count", "sum"),
-        )
-        .reset_index()
-    )
-
-    # Normalize province to 2-letter abbreviation (vectorized)
-    final["province_abbr"] = _normalize_province_vectorized(final)
+    # Combine the per-file tables and re-aggregate codes that span files.
+    # Column-wise cleanup is done on the Arrow table so the DataFrame is built
+    # once; pandas only takes over for province normalization.
+    final = _combine_files(all_aggregated)
 
     # Normalize city names to title case
-    final["city_name"] = final["city_name"].str.strip().str.title()
+    final = final.set_column(
+        final.schema.get_field_index("city_name"),
+        "city_name",
+        _map_distinct(
+            final["city_name"],
+            lambda names: pc.utf8_title(pc.utf8_trim_whitespace(names)),
+        ),
+    )
 
     # Use CSD name as csd_code (the NAR doesn't have numeric CSD codes)
-    final = final.rename(columns={"csd_name": "csd_code"})
+    final = final.rename_columns(
+        ["csd_code" if name == "csd_name" else name for name in final.column_names]
+    )
 
     # No lat/lon available from NAR (BG_X/BG_Y are in Lambert projection)
-    final["latitude"] = None
-    final["longitude"] = None
+    no_coordinates = pa.nulls(final.num_rows, pa.float64())
+    final = final.append_column("latitude", no_coordinates)
+    final = final.append_column("longitude", no_coordinates)
+    final = final.to_pandas()
+
+    # Normalize province to 2-letter abbreviation (vectorized)
+    final["province_abbr"] = _normalize_province_vectorized(final)
 
     # Drop intermediate columns
     final = final.drop(columns=["province_code", "province_abbr_raw"])
@@ -227,56 +477,61 @@ def parse_nar_snapshot(period: str) -> pd.DataFrame:
     return final
 
 
+def _parse_nar_snapshot_ipc(period: str) -> bytes:
+    """parse_nar_snapshot() for process pools, returned as an Arrow IPC stream.
+
+    Pickling a DataFrame serializes its string columns value by value; the IPC
+    stream ships the Arrow buffers as they are, several times faster to send
+    and to read back (see _read_ipc).
+    """
+    table = pa.Table.from_pandas(parse_nar_snapshot(period), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _read_ipc(data: bytes) -> pd.DataFrame:
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+def _snapshot_rows(table: pa.Table, snapshot_date: str) -> Iterator[tuple]:
+    """Yield postal_code_snapshots rows (in _NAR_INSERT_COLUMNS order) from a parsed table.
+
+    Values are converted one record batch at a time, with the constant
+    snapshot_date/source_type columns repeated instead of materialized.
+    """
+    for batch in table.select(_NAR_VALUE_COLUMNS).to_batches(max_chunksize=_INSERT_BATCH_ROWS):
+        postal_codes, *values = (column.to_pylist() for column in batch.columns)
+        yield from zip(postal_codes, repeat(snapshot_date), repeat("nar"), *values)
+
+
 def _store_nar_snapshot(period: str, df: pd.DataFrame) -> int:
     """Store a pre-parsed NAR DataFrame into the database. Returns unique PC count."""
-    info = NAR_SNAPSHOTS[period]
-    snapshot_date = info["reference_date"]
+    snapshot_date = NAR_BY_PERIOD[period].reference_date
 
-    # Save processed parquet
+    # One Arrow table feeds both the parquet and the database load
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # Save processed parquet (zstd, as `export --format parquet` writes)
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     parquet_path = PROCESSED_DIR / f"nar_{period}_unique.parquet"
-    df.to_parquet(parquet_path, index=False)
+    pq.write_table(table, parquet_path, compression="zstd", compression_level=3)
     logger.info("Saved %s", parquet_path)
 
     # Insert into database
     db.init_db()
-    conn = db.get_connection()
-
-    # Delete existing snapshot data for this period (in case of reprocess)
-    conn.execute(
-        "DELETE FROM postal_code_snapshots WHERE snapshot_date = ? AND source_type = 'nar'",
-        (snapshot_date,),
-    )
-
-    # Prepare for insert
-    df = df.copy()
-    df["snapshot_date"] = snapshot_date
-    df["source_type"] = "nar"
-
-    insert_cols = [
-        "postal_code",
-        "snapshot_date",
-        "source_type",
-        "province_abbr",
-        "city_name",
-        "latitude",
-        "longitude",
-        "csd_code",
-        "address_count",
-    ]
-    df[insert_cols].to_sql(
-        "postal_code_snapshots",
-        conn,
-        if_exists="append",
-        index=False,
-        chunksize=5000,
-    )
-    conn.commit()
-    conn.close()
-
-    # Record processing
+    conn = db.get_bulk_connection()
     total_rows = int(df["address_count"].sum())
-    db.mark_processed("nar", snapshot_date, total_rows, len(df))
+    with db.write_transaction(conn):
+        # Replaces any earlier load of this period (in case of reprocess)
+        db.load_snapshot(
+            conn, "nar", snapshot_date, _NAR_INSERT_COLUMNS,
+            _snapshot_rows(table, snapshot_date),
+        )
+        # Record processing in the same commit as the load
+        db.mark_processed("nar", snapshot_date, total_rows, len(df), conn=conn)
+    conn.close()
 
     logger.info("Loaded %d postal codes for NAR %s into database", len(df), period)
     return len(df)
@@ -284,8 +539,7 @@ def _store_nar_snapshot(period: str, df: pd.DataFrame) -> int:
 
 def process_nar_snapshot(period: str, force: bool = False) -> int:
     """Parse, save to parquet, and load into database. Returns unique PC count."""
-    info = NAR_SNAPSHOTS[period]
-    snapshot_date = info["reference_date"]
+    snapshot_date = NAR_BY_PERIOD[period].reference_date
 
     # Check if already processed
     if not force:
@@ -310,54 +564,53 @@ def process_all_nar(force: bool = False) -> dict[str, int]:
     """Process all downloaded NAR snapshots in parallel. Returns {period: count}."""
     # Phase 1: Determine which periods need processing
     periods_to_process = []
-    for period in NAR_SNAPSHOTS:
-        extract_dir = RAW_NAR_DIR / period
-        if not extract_dir.exists():
+    conn = db.get_connection()
+    for snapshot in NAR_SNAPSHOTS:
+        period = snapshot.period
+        zip_path = RAW_NAR_DIR / f"{period}.zip"
+        if not (zip_path.exists() or (RAW_NAR_DIR / period).exists()):
             logger.warning("NAR %s not downloaded, skipping", period)
             continue
 
         if not force:
-            info = NAR_SNAPSHOTS[period]
-            snapshot_date = info["reference_date"]
-            conn = db.get_connection()
+            snapshot_date = snapshot.reference_date
             row = conn.execute(
                 "SELECT processed_at FROM data_sources WHERE source_type = 'nar' AND reference_date = ?",
                 (snapshot_date,),
             ).fetchone()
-            conn.close()
             if row and row["processed_at"]:
                 logger.info("NAR %s already processed, skipping", period)
                 continue
 
         periods_to_process.append(period)
+    conn.close()
 
     if not periods_to_process:
         return {}
 
-    # Phase 2: Parse all snapshots in parallel (CPU-bound, no DB access)
-    parsed_results = {}
+    # Phase 2: Parse all snapshots in parallel (CPU-bound, no DB access).
+    # Each snapshot is stored as soon as its parse finishes, so the SQLite
+    # writes (single writer, in this process) overlap the parses still running.
+    counts = {}
     max_workers = min(len(periods_to_process), os.cpu_count() or 4)
     logger.info("Parsing %d snapshots with %d workers", len(periods_to_process), max_workers)
 
     with ProcessPoolExecutor(max_workers=max_workers) as executor:
         futures = {
-            executor.submit(parse_nar_snapshot, period): period
+            executor.submit(_parse_nar_snapshot_ipc, period): period
             for period in periods_to_process
         }
         for future in as_completed(futures):
             period = futures[future]
             try:
-                parsed_results[period] = future.result()
-                logger.info("Parsed NAR %s: %d unique postal codes", period, len(parsed_results[period]))
+                df = _read_ipc(future.result())
             except Exception:
                 logger.exception("Failed to parse NAR %s", period)
+                continue
+            logger.info("Parsed NAR %s: %d unique postal codes", period, len(df))
+            counts[period] = _store_nar_snapshot(period, df)
 
-    # Phase 3: Write to DB sequentially (SQLite single-writer constraint)
-    results = {}
-    for period in periods_to_process:
-        if period not in parsed_results:
-            continue
-        count = _store_nar_snapshot(period, parsed_results[period])
-        results[period] = count
+    # Report in snapshot order regardless of completion order
+    results = {period: counts[period] for period in periods_to_process if period in counts}
 
     return results
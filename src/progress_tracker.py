@@ -3,15 +3,206 @@ Progress tracking module for the Canadian Postal Code Change Tracking System.
 
 This module provides functionality to automatically track and update progress
 information during data processing operations.
+
+Updates only change the tracker's in-memory state; the markdown file is parsed
+once on first use and rendered by ``flush()``. The tracker's own sections are
+regenerated from that state; any other ``## `` section (e.g. one added by hand)
+is kept verbatim after the section it followed. Inside a ``with tracker:`` block
+(the CLI holds one for each command) the file is written once, on leaving the
+outermost block; outside one, every update is written straight away.
 """
 
 import datetime
-import os
+import functools
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 PROGRESS_FILE_PATH = Path("PROCESSING_PROGRESS.md")
 
+TITLE = "# Processing Progress Tracker"
+INTRO = (
+    "This file tracks the status of data processing operations for the "
+    "Canadian Postal Code Change Tracking System."
+)
+
+# Table key -> heading shown under "## Data Sources Status"
+TABLE_TITLES = {
+    "NAR": "NAR (National Address Register) - Statistics Canada",
+    "Geocoder.ca": "Geocoder.ca",
+    "GeoNames": "GeoNames",
+}
+TABLE_COLUMNS = ["Period", "Downloaded", "Processed", "Processed File", "Size", "Notes"]
+
+# CLI source name -> (table key, fixed period or None to use the caller's)
+SOURCE_TABLES = {
+    "nar": ("NAR", None),
+    "geocoder": ("Geocoder.ca", "Latest"),
+    "geonames": ("GeoNames", "CA_full"),
+}
+
+PIPELINE_STAGES = ["Download", "Processing", "Diff", "Export"]
+
+# "- Key: value" sections, in render order
+KEY_VALUE_SECTIONS = {
+    "Overall Status": "overall",
+    "Database Status": "database",
+    "Processing Pipeline Status": "pipeline",
+}
+
+# "## " sections the tracker renders; anything else is kept as written
+TRACKED_SECTIONS = {*KEY_VALUE_SECTIONS, "Data Sources Status", "Next Steps", "Notes"}
+
+
+def _default_state() -> dict:
+    """State matching the template written when no progress file exists."""
+    def row(downloaded, processed, processed_file, size, notes):
+        return dict(zip(TABLE_COLUMNS[1:], [downloaded, processed, processed_file, size, notes]))
+
+    return {
+        "overall": {"Last Updated": "", "Processing Pipeline": "", "Status": ""},
+        "tables": {
+            "NAR": {
+                "2022": row("Yes", "Yes", "nar_2022_unique.parquet", "8,229,111 bytes", "Complete"),
+                "2023": row("Yes", "Yes", "nar_2023_unique.parquet", "8,511,472 bytes", "Complete"),
+                "2024-06": row("Yes", "No", "", "", "Pending"),
+                "2024-12": row("Yes", "No", "", "", "Pending"),
+                "2025-07": row("Yes", "No", "", "", "Pending"),
+                "2025-12": row("Yes", "No", "", "", "Pending"),
+            },
+            "Geocoder.ca": {"Latest": row("Yes", "No", "", "", "Pending")},
+            "GeoNames": {"CA_full": row("Yes", "No", "", "", "Pending")},
+        },
+        "database": {
+            "Database File": "postal_codes.db",
+            "Database Size": "247,164,928 bytes",
+            "Snapshots Loaded": "",
+            "Total Postal Codes": "",
+            "Total Changes Detected": "",
+        },
+        "pipeline": {
+            "Download Status": "Complete",
+            "Processing Status": "Partial (2022, 2023 processed; others pending)",
+            "Diff Status": "Pending",
+            "Export Status": "Pending",
+        },
+        "next_steps": [
+            "- [ ] Process remaining NAR snapshots (2024-06, 2024-12, 2025-07, 2025-12)",
+            "- [ ] Process Geocoder.ca data",
+            "- [ ] Process GeoNames data",
+            "- [ ] Run diff operations between snapshots",
+            "- [ ] Export results",
+        ],
+        "notes": [],
+        # Preceding tracked section ("" before the first) -> verbatim lines
+        # of the untracked sections that followed it
+        "extra_sections": {},
+    }
+
+
+def _parse_progress(text: str) -> dict:
+    """Read a rendered progress file back into tracker state.
+
+    Sections and rows missing from the file keep their template defaults.
+    """
+    state = _default_state()
+    parsed_tables: set[str] = set()
+    section = None
+    last_tracked = ""
+    table = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("## ") and stripped[3:] not in TRACKED_SECTIONS:
+            section = stripped[3:]
+            table = None
+            state["extra_sections"].setdefault(last_tracked, []).append(line)
+        elif (section is not None and section not in TRACKED_SECTIONS
+              and not stripped.startswith("## ")):
+            state["extra_sections"][last_tracked].append(line)
+        elif stripped.startswith("### "):
+            title = stripped[4:]
+            table = next((key for key in TABLE_TITLES if title.startswith(key)), None)
+            if table is not None and table not in parsed_tables:
+                state["tables"][table] = {}
+                parsed_tables.add(table)
+        elif stripped.startswith("## "):
+            section = last_tracked = stripped[3:]
+            table = None
+            if section == "Next Steps":
+                state["next_steps"] = []
+        elif table is not None and stripped.startswith("|"):
+            cells = [cell.strip() for cell in stripped.strip("|").split("|")]
+            if cells[0] in ("", "Period") or set(cells[0]) == {"-"}:
+                continue
+            cells += [""] * (len(TABLE_COLUMNS) - len(cells))
+            state["tables"][table][cells[0]] = dict(zip(TABLE_COLUMNS[1:], cells[1:]))
+        elif section in KEY_VALUE_SECTIONS and stripped.startswith("- "):
+            key, sep, value = stripped[2:].partition(":")
+            if sep:
+                state[KEY_VALUE_SECTIONS[section]][key.strip()] = value.strip()
+        elif section == "Next Steps" and stripped.startswith("- "):
+            state["next_steps"].append(stripped)
+        elif section == "Notes" and stripped.startswith("- ") and stripped[2:].strip():
+            state["notes"].append(stripped[2:].strip())
+
+    return state
+
+
+def _render_progress(state: dict) -> str:
+    """Render tracker state as the progress markdown file."""
+    def key_values(values: dict) -> list[str]:
+        return [f"- {key}: {value}" if value else f"- {key}:" for key, value in values.items()]
+
+    def table_row(cells: list[str]) -> str:
+        return "|" + "|".join(f" {cell} " if cell else " " for cell in cells) + "|"
+
+    sources = ["## Data Sources Status"]
+    for table, rows in state["tables"].items():
+        sources += [
+            "",
+            f"### {TABLE_TITLES[table]}",
+            table_row(TABLE_COLUMNS),
+            "|" + "|".join("-" * (len(col) + 2) for col in TABLE_COLUMNS) + "|",
+        ]
+        sources += [
+            table_row([period, *(row[col] for col in TABLE_COLUMNS[1:])])
+            for period, row in rows.items()
+        ]
+
+    # (section title, lines) in file order; blocks are separated by a blank line
+    blocks = [
+        ("", [TITLE, "", INTRO]),
+        ("Overall Status", ["## Overall Status", *key_values(state["overall"])]),
+        ("Data Sources Status", sources),
+        ("Database Status", ["## Database Status", *key_values(state["database"])]),
+        ("Processing Pipeline Status",
+         ["## Processing Pipeline Status", *key_values(state["pipeline"])]),
+        ("Next Steps", ["## Next Steps", *state["next_steps"]]),
+        ("Notes", ["## Notes", *(f"- {note}" for note in state["notes"] or [""])]),
+    ]
+    lines: list[str] = []
+    for title, block in blocks:
+        extra = state["extra_sections"].get(title, [])
+        # The blank lines that separated the extra sections are re-added below
+        while extra and not extra[-1].strip():
+            extra = extra[:-1]
+        for part in (block, extra):
+            if part:
+                if lines:
+                    lines.append("")
+                lines += part
+
+    return "\n".join(lines) + "\n"
+
+
+def _batched(method):
+    """Run a public update as a batch of its own unless one is already open."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class ProgressTracker:
     """Tracks processing progress and updates the human-readable progress file."""
@@ -19,250 +210,113 @@ class ProgressTracker:
     def __init__(self, progress_file: Path = PROGRESS_FILE_PATH):
         self.progress_file = progress_file
         self.current_operation = None
-
-    def _ensure_file_exists(self):
-        """Ensure the progress file exists with basic template."""
-        if not self.progress_file.exists():
-            self.progress_file.write_text("""# Processing Progress Tracker
-
-This file tracks the status of data processing operations for the Canadian Postal Code Change Tracking System.
-
-## Overall Status
-- Last Updated:
-- Processing Pipeline:
-- Status:
-
-## Data Sources Status
-
-### NAR (National Address Register) - Statistics Canada
-| Period | Downloaded | Processed | Processed File | Size | Notes |
-|--------|------------|-----------|----------------|------|-------|
-| 2022 | Yes | Yes | nar_2022_unique.parquet | 8,229,111 bytes | Complete |
-| 2023 | Yes | Yes | nar_2023_unique.parquet | 8,511,472 bytes | Complete |
-| 2024-06 | Yes | No | | | Pending |
-| 2024-12 | Yes | No | | | Pending |
-| 2025-07 | Yes | No | | | Pending |
-| 2025-12 | Yes | No | | | Pending |
-
-### Geocoder.ca
-| Period | Downloaded | Processed | Processed File | Size | Notes |
-|--------|------------|-----------|----------------|------|-------|
-| Latest | Yes | No | | | Pending |
-
-### GeoNames
-| Period | Downloaded | Processed | Processed File | Size | Notes |
-|--------|------------|-----------|----------------|------|-------|
-| CA_full | Yes | No | | | Pending |
-
-## Database Status
-- Database File: postal_codes.db
-- Database Size: 247,164,928 bytes
-- Snapshots Loaded:
-- Total Postal Codes:
-- Total Changes Detected:
-
-## Processing Pipeline Status
-- Download Status: Complete
-- Processing Status: Partial (2022, 2023 processed; others pending)
-- Diff Status: Pending
-- Export Status: Pending
-
-## Next Steps
-- [ ] Process remaining NAR snapshots (2024-06, 2024-12, 2025-07, 2025-12)
-- [ ] Process Geocoder.ca data
-- [ ] Process GeoNames data
-- [ ] Run diff operations between snapshots
-- [ ] Export results
-
-## Notes
--
-
-""")
-
+        self._state: Optional[dict] = None
+        # (mtime_ns, size) of the progress file when _state was read or written
+        self._file_version: Optional[tuple[int, int]] = None
+        self._depth = 0
+
+    def __enter__(self) -> "ProgressTracker":
+        if not self._depth and self._state is not None and self._stat() != self._file_version:
+            # Edited outside this tracker since we last touched it
+            self._state = None
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._depth -= 1
+        if not self._depth:
+            self.flush()
+
+    def _stat(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = self.progress_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _ensure_loaded(self) -> dict:
+        """Return the tracker state, parsing the progress file only when it changed.
+
+        The parsed state stays valid while the file's mtime and size match
+        what this tracker last read or wrote, so back-to-back updates skip
+        the re-read.
+        """
+        if self._state is None:
+            self._file_version = self._stat()
+            if self._file_version is not None:
+                self._state = _parse_progress(self.progress_file.read_text())
+            else:
+                self._state = _default_state()
+        return self._state
+
+    def flush(self):
+        """Write the progress file if any update has been made."""
+        if self._state is not None:
+            self.progress_file.write_text(_render_progress(self._state))
+            self._file_version = self._stat()
+
+    @_batched
     def update_overall_status(self, operation: str, status: str):
         """Update the overall status section."""
-        self._ensure_file_exists()
-
-        content = self.progress_file.read_text()
-
-        # Update Last Updated
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        content = self._replace_line(content, "- Last Updated:", f"- Last Updated: {now}")
-
-        # Update Processing Pipeline
-        content = self._replace_line(content, "- Processing Pipeline:", f"- Processing Pipeline: {operation}")
-
-        # Update Status
-        content = self._replace_line(content, "- Status:", f"- Status: {status}")
-
-        self.progress_file.write_text(content)
+        overall = self._ensure_loaded()["overall"]
+        overall["Last Updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        overall["Processing Pipeline"] = operation
+        overall["Status"] = status
         self.current_operation = operation
 
+    @_batched
     def mark_file_downloaded(self, source: str, period: str):
         """Mark a file as downloaded in the progress file."""
-        self._ensure_file_exists()
-
-        content = self.progress_file.read_text()
+        self.mark_files_downloaded_bulk(source, [period])
 
-        # Update the specific row in the appropriate table
-        if source.lower() == "nar":
-            # Update the NAR table
-            content = self._update_table_row(content, "NAR", period, "Downloaded", "Yes")
-        elif source.lower() == "geocoder":
-            # Update the Geocoder.ca table
-            content = self._update_table_row(content, "Geocoder.ca", "Latest", "Downloaded", "Yes")
-        elif source.lower() == "geonames":
-            # Update the GeoNames table
-            content = self._update_table_row(content, "GeoNames", "CA_full", "Downloaded", "Yes")
+    @_batched
+    def mark_files_downloaded_bulk(self, source: str, periods: Iterable[str]):
+        """Mark several files of one source as downloaded."""
+        for period in periods:
+            row = self._table_row(source, period)
+            if row is not None:
+                row["Downloaded"] = "Yes"
 
-        # Update the overall download status
-        content = self._update_pipeline_status(content, "Download", "Complete")
-
-        self.progress_file.write_text(content)
+        self.update_pipeline_stage_status("Download", "Complete")
 
+    @_batched
     def mark_file_processed(self, source: str, period: str, processed_file: str = "", size: str = ""):
         """Mark a file as processed in the progress file."""
-        self._ensure_file_exists()
-
-        content = self.progress_file.read_text()
-
-        # Update the specific row in the appropriate table
-        if source.lower() == "nar":
-            # Update the NAR table
-            content = self._update_table_row(content, "NAR", period, "Processed", "Yes")
-            if processed_file:
-                content = self._update_table_row(content, "NAR", period, "Processed File", processed_file)
-            if size:
-                content = self._update_table_row(content, "NAR", period, "Size", size)
-        elif source.lower() == "geocoder":
-            # Update the Geocoder.ca table
-            content = self._update_table_row(content, "Geocoder.ca", "Latest", "Processed", "Yes")
-            if processed_file:
-                content = self._update_table_row(content, "Geocoder.ca", "Latest", "Processed File", processed_file)
-            if size:
-                content = self._update_table_row(content, "Geocoder.ca", "Latest", "Size", size)
-        elif source.lower() == "geonames":
-            # Update the GeoNames table
-            content = self._update_table_row(content, "GeoNames", "CA_full", "Processed", "Yes")
+        self.mark_files_processed_bulk(source, [(period, processed_file, size)])
+
+    @_batched
+    def mark_files_processed_bulk(self, source: str, items: Iterable[tuple[str, str, str]]):
+        """Mark several files of one source as processed.
+
+        Each item is a ``(period, processed_file, size)`` tuple; empty strings
+        leave the corresponding cell unchanged.
+        """
+        for period, processed_file, size in items:
+            row = self._table_row(source, period)
+            if row is None:
+                continue
+            row["Processed"] = "Yes"
             if processed_file:
-                content = self._update_table_row(content, "GeoNames", "CA_full", "Processed File", processed_file)
+                row["Processed File"] = processed_file
             if size:
-                content = self._update_table_row(content, "GeoNames", "CA_full", "Size", size)
-
-        # Update the overall processing status
-        content = self._update_pipeline_status(content, "Processing", self._get_processing_status(content))
-
-        self.progress_file.write_text(content)
-
-    def _update_table_row(self, content: str, table_name: str, period: str, column: str, value: str) -> str:
-        """Update a specific cell in a table."""
-        lines = content.split('\n')
-        new_lines = []
-
-        in_correct_table = False
-        header_found = False
-        header_columns = []
-
-        for line in lines:
-            new_lines.append(line)
-
-            # Find the table header
-            if f"### {table_name}" in line or (table_name in line and "###" in line):
-                in_correct_table = True
-                header_found = False
-            elif in_correct_table and '|' in line and '----' not in line.lower():
-                # This could be the header row
-                if 'Period' in line and 'Downloaded' in line:
-                    header_found = True
-                    header_columns = [col.strip() for col in line.split('|')]
-                elif header_found and period in line:
-                    # This is the row for the specific period
-                    parts = line.split('|')
-                    if len(parts) >= len(header_columns):
-                        # Find the column index
-                        col_idx = -1
-                        for i, h_col in enumerate(header_columns):
-                            if column.strip() in h_col.strip():
-                                col_idx = i
-                                break
-
-                        if col_idx != -1 and col_idx < len(parts):
-                            parts[col_idx] = f" {value} "
-                            new_lines[-1] = '|'.join(parts)
-                    break
-            elif '###' in line and table_name not in line:
-                # Moving to a different table, reset
-                in_correct_table = False
-                header_found = False
-
-        return '\n'.join(new_lines)
-
-    def _update_pipeline_status(self, content: str, stage: str, status: str) -> str:
-        """Update the status of a specific pipeline stage."""
-        if stage == "Download":
-            content = self._replace_line(content, "- Download Status:", f"- Download Status: {status}")
-        elif stage == "Processing":
-            content = self._replace_line(content, "- Processing Status:", f"- Processing Status: {status}")
-        elif stage == "Diff":
-            content = self._replace_line(content, "- Diff Status:", f"- Diff Status: {status}")
-        elif stage == "Export":
-            content = self._replace_line(content, "- Export Status:", f"- Export Status: {status}")
-
-        return content
-
-    def _get_processing_status(self, content: str) -> str:
+                row["Size"] = size
+
+        self.update_pipeline_stage_status("Processing", self._get_processing_status())
+
+    def _table_row(self, source: str, period: str) -> Optional[dict]:
+        """Return the table row for a source period, adding it if missing."""
+        if source.lower() not in SOURCE_TABLES:
+            return None
+        table, fixed_period = SOURCE_TABLES[source.lower()]
+        rows = self._ensure_loaded()["tables"][table]
+        new_row = {"Downloaded": "No", "Processed": "No", "Processed File": "", "Size": "", "Notes": ""}
+        return rows.setdefault(fixed_period or period, new_row)
+
+    def _get_processing_status(self) -> str:
         """Get the overall processing status based on individual file statuses."""
-        # Count how many files are processed vs total
-        lines = content.split('\n')
-
-        nar_processed = 0
-        nar_total = 0
-        geocoder_processed = 0
-        geocoder_total = 0
-        geonames_processed = 0
-        geonames_total = 0
-
-        in_nar_table = False
-        in_geocoder_table = False
-        in_geonames_table = False
-
-        for line in lines:
-            if "### NAR" in line:
-                in_nar_table = True
-                in_geocoder_table = False
-                in_geonames_table = False
-            elif "### Geocoder.ca" in line:
-                in_nar_table = False
-                in_geocoder_table = True
-                in_geonames_table = False
-            elif "### GeoNames" in line:
-                in_nar_table = False
-                in_geocoder_table = False
-                in_geonames_table = True
-            elif '|' in line and '----' not in line and 'Period' not in line:
-                # This is a data row
-                if in_nar_table and '|' in line:
-                    parts = [p.strip() for p in line.split('|')]
-                    if len(parts) >= 3:  # At least Period | Downloaded | Processed
-                        nar_total += 1
-                        if len(parts) > 2 and 'Yes' in parts[2]:  # Processed column
-                            nar_processed += 1
-                elif in_geocoder_table and '|' in line:
-                    parts = [p.strip() for p in line.split('|')]
-                    if len(parts) >= 3:
-                        geocoder_total += 1
-                        if len(parts) > 2 and 'Yes' in parts[2]:
-                            geocoder_processed += 1
-                elif in_geonames_table and '|' in line:
-                    parts = [p.strip() for p in line.split('|')]
-                    if len(parts) >= 3:
-                        geonames_total += 1
-                        if len(parts) > 2 and 'Yes' in parts[2]:
-                            geonames_processed += 1
-
-        # Determine overall status
-        total_files = nar_total + geocoder_total + geonames_total
-        processed_files = nar_processed + geocoder_processed + geonames_processed
+        rows = [row for table in self._ensure_loaded()["tables"].values() for row in table.values()]
+        total_files = len(rows)
+        processed_files = sum("Yes" in row["Processed"] for row in rows)
 
         if processed_files == 0:
             return "Not Started"
@@ -271,44 +325,36 @@ This file tracks the status of data processing operations for the Canadian Posta
         else:
             return f"Partial ({processed_files}/{total_files} files)"
 
+    @_batched
     def update_database_status(self, db_path: Optional[Path] = None,
                               total_postal_codes: Optional[int] = None,
                               total_changes: Optional[int] = None):
         """Update the database status section."""
-        self._ensure_file_exists()
-
-        content = self.progress_file.read_text()
+        database = self._ensure_loaded()["database"]
 
         if db_path:
-            content = self._replace_line(content, "- Database File:", f"- Database File: {db_path.name}")
+            database["Database File"] = db_path.name
             # Also update size if we can get it
             if db_path.exists():
-                size = db_path.stat().st_size
-                content = self._replace_line(content, "- Database Size:", f"- Database Size: {size} bytes")
+                database["Database Size"] = f"{db_path.stat().st_size} bytes"
 
         if total_postal_codes is not None:
-            content = self._replace_line(content, "- Total Postal Codes:", f"- Total Postal Codes: {total_postal_codes}")
+            database["Total Postal Codes"] = str(total_postal_codes)
 
         if total_changes is not None:
-            content = self._replace_line(content, "- Total Changes Detected:", f"- Total Changes Detected: {total_changes}")
-
-        self.progress_file.write_text(content)
+            database["Total Changes Detected"] = str(total_changes)
 
+    @_batched
     def update_pipeline_stage_status(self, stage: str, status: str):
         """Update the status of a specific pipeline stage."""
-        self._ensure_file_exists()
-
-        content = self.progress_file.read_text()
-        content = self._update_pipeline_status(content, stage, status)
-
-        self.progress_file.write_text(content)
+        if stage in PIPELINE_STAGES:
+            self._ensure_loaded()["pipeline"][f"{stage} Status"] = status
 
+    @_batched
     def update_data_source_status(self, source: str, latest_snapshot: Optional[str] = None,
                                  record_count: Optional[int] = None,
                                  last_processed: Optional[str] = None, status: Optional[str] = None):
         """Update the status of a data source by adding a note."""
-        self._ensure_file_exists()
-
         # Create a note about the data source status
         note_parts = [f"{source} source:"]
         if latest_snapshot:
@@ -323,46 +369,20 @@ This file tracks the status of data processing operations for the Canadian Posta
         note = ", ".join(note_parts)
         self.add_note(note)
 
+    @_batched
     def add_note(self, note: str):
         """Add a note to the notes section."""
-        self._ensure_file_exists()
-
-        content = self.progress_file.read_text()
-
-        # Simply append the note to the end of the file in the notes section
-        lines = content.split('\n')
-        new_lines = []
-        notes_found = False
-
-        for line in lines:
-            new_lines.append(line)
-            if line.startswith("## Notes"):
-                notes_found = True
-
-        # If we found the notes section, add the note after the last note
-        if notes_found:
-            new_lines.append(f"- {note}")
-        else:
-            # If no notes section exists, add it at the end
-            new_lines.extend([
-                "",
-                "## Notes",
-                f"- {note}",
-                ""
-            ])
-
-        content = '\n'.join(new_lines)
-        self.progress_file.write_text(content)
-
-    def _replace_line(self, content: str, start_marker: str, replacement: str) -> str:
-        """Replace a line that starts with the marker."""
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if line.strip().startswith(start_marker):
-                lines[i] = replacement
-                break
-        return '\n'.join(lines)
+        self._ensure_loaded()["notes"].append(note)
+
+    @_batched
+    def log_processing_operation(self, source: str, operation: str, status: str,
+                                 duration: Optional[float] = None):
+        """Add a note recording a processing step of one data source."""
+        note = f"{source} {operation}: {status}"
+        if duration is not None:
+            note += f" (took {duration:.2f}s)"
+        self.add_note(note)
 
 
 # Global instance for easy access
-tracker = ProgressTracker()
\ No newline at end of file
+tracker = ProgressTracker()
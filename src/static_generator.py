@@ -9,38 +9,52 @@ Data sources used by this software have their own licenses:
 - GeoNames: CC BY 4.0
 """
 
-import json
 import logging
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from src import db
+from src.config import STATIC_DATA_FILES
+from src.json_encode import dumps
 
 logger = logging.getLogger(__name__)
 
 STATIC_DATA_DIR = Path("docs/data")
 
 
-def generate_all() -> None:
-    """Generate all JSON data files for the static site."""
-    STATIC_DATA_DIR.mkdir(parents=True, exist_ok=True)
+def generate_all(names: Iterable[str] | None = None) -> None:
+    """Generate the JSON data files for the static site.
 
-    conn = db.get_connection()
+    ``names`` (from STATIC_DATA_FILES) limits the run to those files, e.g. only
+    the listings for the change types a new diff produced; the other files
+    are left as they are. The generators only read the database and each
+    writes its own file, so they run concurrently, each on its own read-only
+    connection (sqlite3 releases the GIL while a query executes).
+    """
+    STATIC_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    _generate_summary(conn)
-    _generate_timeline(conn)
-    _generate_by_province(conn)
-    _generate_added(conn)
-    _generate_removed(conn)
-    _generate_city_changed(conn)
+    generators = list(GENERATORS.values()) if names is None else [GENERATORS[n] for n in names]
+    if not generators:
+        return
+    with ThreadPoolExecutor(max_workers=len(generators)) as executor:
+        # list() re-raises the first generator error
+        list(executor.map(_run_generator, generators))
 
-    conn.close()
     logger.info("Static data generated in %s", STATIC_DATA_DIR)
 
 
+def _run_generator(generate) -> None:
+    conn = db.get_read_connection()
+    try:
+        generate(conn)
+    finally:
+        conn.close()
+
+
 def _write_json(filename: str, data: object) -> None:
     path = STATIC_DATA_DIR / filename
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    path.write_bytes(dumps(data))
     size_kb = path.stat().st_size / 1024
     logger.info("  Wrote %s (%.1f KB)", filename, size_kb)
 
@@ -57,7 +71,7 @@ def _generate_summary(conn) -> None:
     ).fetchone()
 
     changes = conn.execute(
-        "SELECT change_type, COUNT(*) as cnt FROM postal_code_changes "
+        "SELECT change_type, SUM(change_count) as cnt FROM change_counts "
         "WHERE source_type = 'merged' AND change_type IN ('added', 'removed', 'city_changed') "
         "GROUP BY change_type"
     ).fetchall()
@@ -79,8 +93,8 @@ def _generate_timeline(conn) -> None:
     """Per-period change counts."""
     rows = conn.execute(
         "SELECT snapshot_before || ' to ' || snapshot_after as period, "
-        "  change_type, COUNT(*) as cnt "
-        "FROM postal_code_changes "
+        "  change_type, SUM(change_count) as cnt "
+        "FROM change_counts "
         "WHERE source_type = 'merged' AND change_type IN ('added', 'removed', 'city_changed') "
         "GROUP BY period, change_type "
         "ORDER BY period, change_type"
@@ -100,8 +114,8 @@ def _generate_timeline(conn) -> None:
 def _generate_by_province(conn) -> None:
     """Per-province change counts."""
     rows = conn.execute(
-        "SELECT province_abbr, change_type, COUNT(*) as cnt "
-        "FROM postal_code_changes "
+        "SELECT province_abbr, change_type, SUM(change_count) as cnt "
+        "FROM change_counts "
         "WHERE source_type = 'merged' AND change_type IN ('added', 'removed', 'city_changed') "
         "  AND province_abbr IS NOT NULL AND province_abbr != '' "
         "GROUP BY province_abbr, change_type "
@@ -118,40 +132,40 @@ def _generate_by_province(conn) -> None:
     _write_json("by_province.json", provinces)
 
 
+def _fetch_tuples(conn, sql: str) -> list[tuple]:
+    """Fetch rows as plain tuples, which the per-change listings unpack by position.
+
+    Skips building an sqlite3.Row per row and a name lookup per cell.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor.execute(sql).fetchall()
+
+
 def _generate_added(conn) -> None:
     """All postal codes added after initial snapshot."""
-    rows = conn.execute(
-        "SELECT postal_code as pc, snapshot_after as date, "
-        "  province_abbr as prov, fsa "
-        "FROM postal_code_changes "
-        "WHERE source_type = 'merged' AND change_type = 'added' "
-        "ORDER BY snapshot_after, postal_code"
-    ).fetchall()
-
-    # Add city from summary table for each postal code
-    cities = {}
-    city_rows = conn.execute(
-        "SELECT postal_code, city_name FROM postal_code_summary"
-    ).fetchall()
-    for r in city_rows:
-        cities[r["postal_code"]] = r["city_name"]
+    # City comes from the summary table, joined in SQL like _generate_removed
+    rows = _fetch_tuples(
+        conn,
+        "SELECT c.postal_code as pc, c.snapshot_after as date, "
+        "  c.province_abbr as prov, c.fsa, "
+        "  s.city_name as city "
+        "FROM postal_code_changes c "
+        "LEFT JOIN postal_code_summary s ON s.postal_code = c.postal_code "
+        "WHERE c.source_type = 'merged' AND c.change_type = 'added' "
+        "ORDER BY c.snapshot_after, c.postal_code"
+    )
 
-    data = []
-    for r in rows:
-        data.append({
-            "pc": r["pc"],
-            "date": r["date"],
-            "prov": r["prov"],
-            "city": cities.get(r["pc"], ""),
-            "fsa": r["fsa"],
-        })
+    data = [{"pc": pc, "date": date, "prov": prov, "city": city or "", "fsa": fsa}
+            for pc, date, prov, fsa, city in rows]
 
     _write_json("added.json", data)
 
 
 def _generate_removed(conn) -> None:
     """All removed postal codes."""
-    rows = conn.execute(
+    rows = _fetch_tuples(
+        conn,
         "SELECT c.postal_code as pc, c.snapshot_after as date, "
         "  c.province_abbr as prov, c.fsa, "
         "  s.city_name as city "
@@ -159,28 +173,40 @@ def _generate_removed(conn) -> None:
         "LEFT JOIN postal_code_summary s ON s.postal_code = c.postal_code "
         "WHERE c.source_type = 'merged' AND c.change_type = 'removed' "
         "ORDER BY c.snapshot_after, c.postal_code"
-    ).fetchall()
+    )
 
-    data = [{"pc": r["pc"], "date": r["date"], "prov": r["prov"],
-             "city": r["city"] or "", "fsa": r["fsa"]} for r in rows]
+    data = [{"pc": pc, "date": date, "prov": prov, "city": city or "", "fsa": fsa}
+            for pc, date, prov, fsa, city in rows]
 
     _write_json("removed.json", data)
 
 
 def _generate_city_changed(conn) -> None:
     """All city name changes with subtype classification."""
-    rows = conn.execute(
+    rows = _fetch_tuples(
+        conn,
         "SELECT postal_code as pc, snapshot_after as date, "
         "  province_abbr as prov, fsa, old_value as old_city, new_value as new_city, "
         "  change_subtype as sub "
         "FROM postal_code_changes "
         "WHERE source_type = 'merged' AND change_type = 'city_changed' "
         "ORDER BY snapshot_after, postal_code"
-    ).fetchall()
+    )
 
-    data = [{"pc": r["pc"], "date": r["date"], "prov": r["prov"],
-             "fsa": r["fsa"], "old": r["old_city"] or "", "new": r["new_city"] or "",
-             "sub": r["sub"] or ""}
-            for r in rows]
+    data = [{"pc": pc, "date": date, "prov": prov, "fsa": fsa,
+             "old": old_city or "", "new": new_city or "", "sub": sub or ""}
+            for pc, date, prov, fsa, old_city, new_city, sub in rows]
 
     _write_json("city_changed.json", data)
+
+
+# STATIC_DATA_FILES name -> generator. summary, timeline and by_province count
+# every change type; each listing depends on its own change type only.
+GENERATORS = dict(zip(STATIC_DATA_FILES, (
+    _generate_summary,
+    _generate_timeline,
+    _generate_by_province,
+    _generate_added,
+    _generate_removed,
+    _generate_city_changed,
+), strict=True))
@@ -0,0 +1,36 @@
+"""Wall-clock timing helpers for CLI stages."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class Timer:
+    """Monotonic stopwatch that starts on creation.
+
+    ``elapsed`` reads the running time until ``stop()`` freezes it.
+    """
+
+    __slots__ = ("_start", "_end")
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self._end: float | None = None
+
+    def stop(self) -> None:
+        self._end = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+
+@contextmanager
+def timed() -> Iterator[Timer]:
+    """Time the enclosed block; the yielded timer stops when it exits."""
+    timer = Timer()
+    try:
+        yield timer
+    finally:
+        timer.stop()
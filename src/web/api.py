@@ -9,36 +9,141 @@ Data sources used by this software have their own licenses:
 - GeoNames: CC BY 4.0
 """
 
-from fastapi import APIRouter, Query
+import base64
+import binascii
+import functools
+import json
+import threading
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
 
 from src import db
+from src.json_encode import dumps
 
+# Handlers read through db.get_shared_reader(): one cached read-only
+# connection per server worker thread, opened (and PRAGMA-configured) once
 router = APIRouter()
 
+# Most distinct parameter combinations kept by _cached_until_db_changes
+RESPONSE_CACHE_SIZE = 256
+
+_response_cache: dict[tuple, tuple] = {}
+# Sync handlers run on FastAPI's thread pool; guards _response_cache
+_response_cache_lock = threading.Lock()
+
+
+def _db_version() -> tuple:
+    """Fingerprint of the database files that changes with every commit.
+
+    Under WAL each commit appends to the -wal file and a checkpoint rewrites
+    the main file, so their (mtime, size) pairs change whichever process
+    writes; the web server needs no signal from the CLI.
+    """
+    version = []
+    for path in (db.DB_PATH, db.DB_PATH.with_name(db.DB_PATH.name + "-wal")):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            version.append(None)
+        else:
+            version.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+
+def _json_response(content: object) -> Response:
+    """Render a payload of plain dicts, lists and scalars as a JSON response.
+
+    Returning a Response skips FastAPI's jsonable_encoder walk over every
+    row, which dominates for the row-heavy endpoints.
+    """
+    return Response(dumps(content), media_type="application/json")
+
+
+def _fetch_dicts(conn, sql: str, params=()) -> list[dict]:
+    """Fetch rows as dicts ready for the response body.
+
+    Zipping plain tuples with the column names once per query is cheaper
+    than building an sqlite3.Row per row and converting each with dict().
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(sql, params)
+    names = tuple(d[0] for d in cursor.description)
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def _encode_cursor(row) -> str:
+    """Opaque list_changes cursor: the sort key of the last row of a page."""
+    key = [row["snapshot_after"], row["change_type"], row["postal_code"], row["id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        key = None
+    if not (
+        isinstance(key, list)
+        and len(key) == 4
+        and all(isinstance(k, str) for k in key[:3])
+        and type(key[3]) is int
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def _cached_until_db_changes(handler):
+    """Reuse a handler's response for the same arguments until the DB changes.
+
+    For the aggregate endpoints, whose results only change when snapshots or
+    diffs are written. The version is read before the queries run, so a
+    commit racing a request only costs one extra recomputation.
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        key = (handler.__name__, args, tuple(sorted(kwargs.items())))
+        version = _db_version()
+        with _response_cache_lock:
+            cached = _response_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        # Run the queries outside the lock; concurrent misses for one key
+        # just compute it twice
+        result = handler(*args, **kwargs)
+        with _response_cache_lock:
+            if key not in _response_cache and len(_response_cache) >= RESPONSE_CACHE_SIZE:
+                del _response_cache[next(iter(_response_cache))]
+            _response_cache[key] = (version, result)
+        return result
+    return wrapper
+
 
 @router.get("/snapshots")
+@_cached_until_db_changes
 def list_snapshots():
     """List all snapshots with metadata."""
-    conn = db.get_connection()
-    rows = conn.execute(
+    conn = db.get_shared_reader()
+    return _fetch_dicts(
+        conn,
         """
         SELECT source_type, snapshot_date, COUNT(*) AS postal_code_count
         FROM postal_code_snapshots
         GROUP BY source_type, snapshot_date
         ORDER BY source_type, snapshot_date
         """
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    )
 
 
 @router.get("/stats")
+@_cached_until_db_changes
 def get_stats(
     source: str = Query("nar", description="Source type"),
     province: str | None = Query(None, description="Province abbreviation"),
 ):
     """Aggregate statistics."""
-    conn = db.get_connection()
+    conn = db.get_shared_reader()
 
     # Total postal codes and snapshots
     params: list = [source]
@@ -65,8 +170,8 @@ def get_stats(
 
     change_rows = conn.execute(
         f"""
-        SELECT change_type, COUNT(*) AS count
-        FROM postal_code_changes {change_where}
+        SELECT change_type, SUM(change_count) AS count
+        FROM change_counts {change_where}
         GROUP BY change_type ORDER BY count DESC
         """,
         change_params,
@@ -95,8 +200,6 @@ def get_stats(
             prov_params,
         ).fetchall()
 
-    conn.close()
-
     return {
         "total_codes": overview["total_codes"],
         "total_snapshots": overview["total_snapshots"],
@@ -119,9 +222,17 @@ def list_changes(
     from_date: str | None = None,
     to_date: str | None = None,
     search: str | None = None,
+    after: str | None = Query(
+        None, description="next_cursor of the previous page; seeks past it instead of using page"
+    ),
 ):
-    """Paginated, filtered list of change events."""
-    conn = db.get_connection()
+    """Paginated, filtered list of change events.
+
+    Pages are addressed by number, or by passing the previous response's
+    next_cursor as ``after``: the seek costs the same at any depth, where
+    OFFSET sorts and discards every earlier row.
+    """
+    conn = db.get_shared_reader()
 
     conditions = ["source_type = ?"]
     params: list = [source]
@@ -160,28 +271,43 @@ def list_changes(
     ).fetchone()
     total = count_row["total"]
 
-    # Fetch page
+    # Fetch page. (snapshot_after, change_type, postal_code) can repeat when a
+    # non-consecutive pair was diffed alongside the consecutive ones, so id
+    # breaks ties and makes the key unique for the cursor to seek past.
     offset = (page - 1) * per_page
-    rows = conn.execute(
+    if after:
+        last_date, last_type, last_code, last_id = _decode_cursor(after)
+        conditions.append(
+            "(snapshot_after < ? OR (snapshot_after = ? AND "
+            "(change_type, postal_code, id) > (?, ?, ?)))"
+        )
+        params += [last_date, last_date, last_type, last_code, last_id]
+        offset = 0
+    rows = _fetch_dicts(
+        conn,
         f"""
-        SELECT postal_code, change_type, change_subtype, source_type,
+        SELECT id, postal_code, change_type, change_subtype, source_type,
                snapshot_before, snapshot_after,
                old_value, new_value, province_abbr, fsa
-        FROM postal_code_changes {where}
-        ORDER BY snapshot_after DESC, change_type, postal_code
+        FROM postal_code_changes WHERE {" AND ".join(conditions)}
+        ORDER BY snapshot_after DESC, change_type, postal_code, id
         LIMIT ? OFFSET ?
         """,
         [*params, per_page, offset],
-    ).fetchall()
-    conn.close()
+    )
+    next_cursor = _encode_cursor(rows[-1]) if len(rows) == per_page else None
+    for row in rows:
+        # id is only the cursor tiebreaker, not part of the item
+        del row["id"]
 
-    return {
+    return _json_response({
         "total": total,
         "page": page,
         "per_page": per_page,
         "pages": (total + per_page - 1) // per_page,
-        "items": [dict(r) for r in rows],
-    }
+        "items": rows,
+        "next_cursor": next_cursor,
+    })
 
 
 @router.get("/changes/summary")
@@ -192,7 +318,7 @@ def changes_summary(
     to_date: str | None = None,
 ):
     """Change counts grouped by FSA (for choropleth map)."""
-    conn = db.get_connection()
+    conn = db.get_shared_reader()
 
     conditions = ["source_type = ?"]
     params: list = [source]
@@ -209,17 +335,15 @@ def changes_summary(
 
     where = "WHERE " + " AND ".join(conditions)
 
-    rows = conn.execute(
+    return _fetch_dicts(
+        conn,
         f"""
-        SELECT fsa, province_abbr, COUNT(*) AS change_count
-        FROM postal_code_changes {where}
+        SELECT fsa, province_abbr, SUM(change_count) AS change_count
+        FROM change_counts {where}
         GROUP BY fsa ORDER BY change_count DESC
         """,
         params,
-    ).fetchall()
-    conn.close()
-
-    return [dict(r) for r in rows]
+    )
 
 
 @router.get("/changes/timeline")
@@ -228,7 +352,7 @@ def changes_timeline(
     province: str | None = None,
 ):
     """Change counts grouped by snapshot pair and optionally province."""
-    conn = db.get_connection()
+    conn = db.get_shared_reader()
 
     conditions = ["source_type = ?"]
     params: list = [source]
@@ -239,16 +363,17 @@ def changes_timeline(
     where = "WHERE " + " AND ".join(conditions)
 
     # Changes per pair per type
-    rows = conn.execute(
+    rows = _fetch_dicts(
+        conn,
         f"""
         SELECT snapshot_before, snapshot_after, change_type,
-               COUNT(*) AS count
-        FROM postal_code_changes {where}
+               SUM(change_count) AS count
+        FROM change_counts {where}
         GROUP BY snapshot_before, snapshot_after, change_type
         ORDER BY snapshot_after, change_type
         """,
         params,
-    ).fetchall()
+    )
 
     # Active code count per snapshot
     snap_conditions = ["source_type = ?"]
@@ -258,19 +383,19 @@ def changes_timeline(
         snap_params.append(province)
     snap_where = "WHERE " + " AND ".join(snap_conditions)
 
-    snap_rows = conn.execute(
+    snap_rows = _fetch_dicts(
+        conn,
         f"""
         SELECT snapshot_date, COUNT(*) AS active_count
         FROM postal_code_snapshots {snap_where}
         GROUP BY snapshot_date ORDER BY snapshot_date
         """,
         snap_params,
-    ).fetchall()
-    conn.close()
+    )
 
     return {
-        "changes": [dict(r) for r in rows],
-        "snapshots": [dict(r) for r in snap_rows],
+        "changes": rows,
+        "snapshots": snap_rows,
     }
 
 
@@ -278,10 +403,11 @@ def changes_timeline(
 def postal_code_detail(code: str):
     """Full history for a single postal code."""
     code = code.upper().replace(" ", "")
-    conn = db.get_connection()
+    conn = db.get_shared_reader()
 
     # All snapshots
-    snapshots = conn.execute(
+    snapshots = _fetch_dicts(
+        conn,
         """
         SELECT snapshot_date, source_type, province_abbr, city_name,
                latitude, longitude, csd_code, address_count
@@ -290,34 +416,33 @@ def postal_code_detail(code: str):
         ORDER BY snapshot_date
         """,
         (code,),
-    ).fetchall()
+    )
 
     # All changes
-    changes = conn.execute(
+    changes = _fetch_dicts(
+        conn,
         """
         SELECT change_type, change_subtype, source_type,
                snapshot_before, snapshot_after,
                old_value, new_value
         FROM postal_code_changes
         WHERE postal_code = ?
-        ORDER BY snapshot_after
+        ORDER BY snapshot_after, id
         """,
         (code,),
-    ).fetchall()
+    )
 
     # Summary
     summary = conn.execute(
         "SELECT * FROM postal_code_summary WHERE postal_code = ?", (code,)
     ).fetchone()
 
-    conn.close()
-
-    return {
+    return _json_response({
         "postal_code": code,
         "summary": dict(summary) if summary else None,
-        "snapshots": [dict(r) for r in snapshots],
-        "changes": [dict(r) for r in changes],
-    }
+        "snapshots": snapshots,
+        "changes": changes,
+    })
 
 
 @router.get("/fsa/{fsa}")
@@ -328,7 +453,7 @@ def fsa_detail(
 ):
     """All postal codes and changes within an FSA."""
     fsa = fsa.upper()
-    conn = db.get_connection()
+    conn = db.get_shared_reader()
 
     # Get latest snapshot if not specified
     if not snapshot_date:
@@ -340,7 +465,8 @@ def fsa_detail(
 
     codes = []
     if snapshot_date:
-        codes = conn.execute(
+        codes = _fetch_dicts(
+            conn,
             """
             SELECT postal_code, province_abbr, city_name, latitude, longitude,
                    address_count
@@ -349,9 +475,10 @@ def fsa_detail(
             ORDER BY postal_code
             """,
             (fsa, snapshot_date, source),
-        ).fetchall()
+        )
 
-    changes = conn.execute(
+    changes = _fetch_dicts(
+        conn,
         """
         SELECT postal_code, change_type, change_subtype,
                snapshot_before, snapshot_after,
@@ -361,24 +488,23 @@ def fsa_detail(
         ORDER BY snapshot_after DESC, postal_code
         """,
         (fsa, source),
-    ).fetchall()
-
-    conn.close()
+    )
 
-    return {
+    return _json_response({
         "fsa": fsa,
         "snapshot_date": snapshot_date,
-        "postal_codes": [dict(r) for r in codes],
-        "changes": [dict(r) for r in changes],
+        "postal_codes": codes,
+        "changes": changes,
         "total_codes": len(codes),
         "total_changes": len(changes),
-    }
+    })
 
 
 @router.get("/provinces")
+@_cached_until_db_changes
 def list_provinces(source: str = "nar"):
     """Province list with postal code counts from latest snapshot."""
-    conn = db.get_connection()
+    conn = db.get_shared_reader()
 
     latest = conn.execute(
         "SELECT MAX(snapshot_date) FROM postal_code_snapshots WHERE source_type = ?",
@@ -387,7 +513,8 @@ def list_provinces(source: str = "nar"):
 
     rows = []
     if latest:
-        rows = conn.execute(
+        rows = _fetch_dicts(
+            conn,
             """
             SELECT province_abbr, COUNT(*) AS code_count,
                    SUM(CASE WHEN is_rural = 1 THEN 1 ELSE 0 END) AS rural_count
@@ -396,15 +523,13 @@ def list_provinces(source: str = "nar"):
             GROUP BY province_abbr ORDER BY code_count DESC
             """,
             (source, latest),
-        ).fetchall()
-
-    conn.close()
+        )
 
     from src.config import PROVINCE_ABBR_TO_NAME
 
     return [
         {
-            **dict(r),
+            **r,
             "province_name": PROVINCE_ABBR_TO_NAME.get(r["province_abbr"], ""),
         }
         for r in rows
@@ -0,0 +1,48 @@
+"""Concurrency tests for the API response cache."""
+
+import threading
+import time
+
+from src.web import api
+
+
+class _SlowIterDict(dict):
+    """Dict whose iteration yields the GIL, widening the eviction race window."""
+
+    def __iter__(self):
+        for key in super().__iter__():
+            time.sleep(0.001)
+            yield key
+
+
+def test_concurrent_misses_on_full_cache(monkeypatch):
+    cache = _SlowIterDict({("filler", (i,), ()): (0, i) for i in range(api.RESPONSE_CACHE_SIZE)})
+    monkeypatch.setattr(api, "_response_cache", cache)
+    monkeypatch.setattr(api, "_db_version", lambda: 0)
+
+    @api._cached_until_db_changes
+    def handler(x):
+        return x
+
+    threads = 32
+    barrier = threading.Barrier(threads)
+    errors = []
+    results = []
+
+    def worker(n):
+        barrier.wait()
+        try:
+            for i in range(20):
+                results.append(handler(n * 100 + i) == n * 100 + i)
+        except Exception as exc:
+            errors.append(exc)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    assert errors == []
+    assert all(results) and len(results) == threads * 20
+    assert len(cache) == api.RESPONSE_CACHE_SIZE